@@ -10,10 +10,14 @@ from homeassistant.const import (
     CONF_DEVICES,
     CONF_PARAMS,
     CONF_SCAN_INTERVAL,
+    CONF_STATE,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 
+from .api import GoveeApiClient
 from .const import (
+    CONF_API_CLIENT,
     CONF_COORDINATORS,
     DOMAIN,
     FUNC_OPTION_UPDATES,
@@ -22,13 +26,16 @@ from .const import (
 from .entities import (
     GoveeAPIUpdateCoordinator,
 )
+from .quota import LEDGER_STORAGE_VERSION, GoveeAPIRequestLedger
 from .services import (
     async_registerService,
     async_service_SetPollInterval,
 )
+from .state import SNAPSHOT_STORAGE_VERSION, GoveeAPIStateSnapshot
 from .utils import (
-    async_GoveeAPI_GetDeviceState,
-    async_GoveeAPI_GETRequest,
+    GoveeAPI_GetStateSnapshot,
+    GoveeAPI_PlanPollIntervals,
+    async_GoveeAPI_RefreshCoordinators,
 )
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -45,6 +52,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         entry_data = hass.data[DOMAIN][entry.entry_id]
         entry_data[CONF_PARAMS] = entry.data
         entry_data[CONF_SCAN_INTERVAL] = None
+        entry_data[CONF_API_CLIENT] = GoveeApiClient(hass, entry.entry_id, entry.data)
     except Exception as e:
         _LOGGER.error(
             "%s - async_setup_entry: Creating data store failed: %s (%s.%s)",
@@ -55,9 +63,48 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
         return False
 
+    try:
+        _LOGGER.debug("%s - async_setup_entry: Loading api request ledger..", entry.entry_id)
+        await entry_data[CONF_API_CLIENT].ledger.async_load()
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_setup_entry: Loading api request ledger failed: %s (%s.%s)",
+            entry.entry_id,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+        return False
+
+    try:
+        _LOGGER.debug("%s - async_setup_entry: Restoring device state snapshot..", entry.entry_id)
+        await GoveeAPI_GetStateSnapshot(hass, entry.entry_id).async_load()
+    except Exception as e:
+        # without the snapshot the states are requested live below
+        _LOGGER.warning(
+            "%s - async_setup_entry: Restoring device state snapshot failed: %s (%s.%s)",
+            entry.entry_id,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+
+    try:
+        _LOGGER.debug("%s - async_setup_entry: Checking for diagnostics replay file..", entry.entry_id)
+        await entry_data[CONF_API_CLIENT].replay.async_setup()
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_setup_entry: Checking for diagnostics replay file failed: %s (%s.%s)",
+            entry.entry_id,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+        return False
+
     try:
         _LOGGER.debug("%s - async_setup_entry: Receiving cloud devices..", entry.entry_id)
-        api_devices = await async_GoveeAPI_GETRequest(hass, entry.entry_id, "user/devices")
+        api_devices = await entry_data[CONF_API_CLIENT].async_get_devices()
         if api_devices is None:
             return False
         entry_data[CONF_DEVICES] = api_devices
@@ -74,11 +121,14 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     try:
         _LOGGER.debug("%s - async_setup_entry: Creating update coordinators per device..", entry.entry_id)
         entry_data.setdefault(CONF_COORDINATORS, {})
+        states = entry_data.setdefault(CONF_STATE, {})
+        for d in set(states) - {device_cfg.get("device") for device_cfg in api_devices}:
+            del states[d]
         for device_cfg in api_devices:
-            await async_GoveeAPI_GetDeviceState(hass, entry.entry_id, device_cfg)
-            coordinator = GoveeAPIUpdateCoordinator(hass, entry.entry_id, device_cfg)
             d = device_cfg.get("device")
+            coordinator = GoveeAPIUpdateCoordinator(hass, entry.entry_id, device_cfg)
             entry_data[CONF_COORDINATORS][d] = coordinator
+        GoveeAPI_PlanPollIntervals(hass, entry.entry_id, "devices added")
     except Exception as e:
         _LOGGER.error(
             "%s - async_setup_entry: Creating update coordinators failed: %s (%s.%s)",
@@ -116,6 +166,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
         return False
 
+    try:
+        # entities start unavailable or restored from the snapshot and fill in as their devices are refreshed
+        _LOGGER.debug("%s - async_setup_entry: Scheduling first device refreshes..", entry.entry_id)
+        coordinators = entry_data[CONF_COORDINATORS]
+        # devices without any state first
+        devices = sorted(coordinators, key=lambda d: d in entry_data[CONF_STATE])
+        entry.async_create_background_task(
+            hass,
+            async_GoveeAPI_RefreshCoordinators(hass, entry.entry_id, [coordinators[d] for d in devices]),
+            f"{entry.entry_id} first device refresh",
+        )
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_setup_entry: Scheduling first device refreshes failed: %s (%s.%s)",
+            entry.entry_id,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+        return False
+
     try:
         _LOGGER.debug("%s - async_setup_entry: register services", entry.entry_id)
         await async_registerService(hass, "set_poll_interval", async_service_SetPollInterval)
@@ -154,6 +225,24 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             )
             hass.data[DOMAIN][entry.entry_id][FUNC_OPTION_UPDATES]()
 
+            # Write api request ledger
+            _LOGGER.debug("%s - async_unload_entry: Write api request ledger", entry.entry_id)
+            await hass.data[DOMAIN][entry.entry_id][CONF_API_CLIENT].ledger.async_flush()
+
+            # Close pooled api client session
+            _LOGGER.debug("%s - async_unload_entry: Close api client session", entry.entry_id)
+            await hass.data[DOMAIN][entry.entry_id][CONF_API_CLIENT].async_close()
+
+            # Write device state snapshot
+            _LOGGER.debug("%s - async_unload_entry: Write device state snapshot", entry.entry_id)
+            await GoveeAPI_GetStateSnapshot(hass, entry.entry_id).async_flush()
+
+            # Cancel the rollbacks of unconfirmed optimistic states
+            _LOGGER.debug("%s - async_unload_entry: Cancel optimistic state rollbacks", entry.entry_id)
+            for state in hass.data[DOMAIN][entry.entry_id].get(CONF_STATE, {}).values():
+                for pending in state.pending.values():
+                    pending.release()
+
             # Remove data store
             _LOGGER.debug("%s - async_unload_entry: Remove data store: %s.%s ", entry.entry_id, DOMAIN, entry.entry_id)
             hass.data[DOMAIN].pop(entry.entry_id)
@@ -168,3 +257,30 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             type(e).__name__,
         )
         return False
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of a config entry."""
+    try:
+        _LOGGER.debug("%s - async_remove_entry: Remove api request ledger", entry.entry_id)
+        await Store(hass, LEDGER_STORAGE_VERSION, GoveeAPIRequestLedger.storage_key(entry.entry_id)).async_remove()
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_remove_entry: Remove api request ledger failed: %s (%s.%s)",
+            entry.entry_id,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+
+    try:
+        _LOGGER.debug("%s - async_remove_entry: Remove device state snapshot", entry.entry_id)
+        await Store(hass, SNAPSHOT_STORAGE_VERSION, GoveeAPIStateSnapshot.storage_key(entry.entry_id)).async_remove()
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_remove_entry: Remove device state snapshot failed: %s (%s.%s)",
+            entry.entry_id,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
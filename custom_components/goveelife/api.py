@@ -0,0 +1,769 @@
+"""API client for the Govee Life integration."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import heapq
+import itertools
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Any, Final, TypedDict
+
+import aiohttp
+from homeassistant.const import (
+    CONF_API_KEY,
+    CONF_TIMEOUT,
+    CONF_URL,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.util import dt as dt_util
+
+from .cassette import GoveeAPICassette
+from .const import (
+    API_DAILY_LIMIT,
+    CASSETTE_RECORD,
+    CASSETTE_REPLAY,
+    CIRCUIT_BREAKER_RECOVERY,
+    CIRCUIT_BREAKER_THRESHOLD,
+    CLOUD_API_HEADER_KEY,
+    CLOUD_API_URL_OPENAPI,
+    CONF_BURST_SIZE,
+    CONF_CASSETTE,
+    CONF_CASSETTE_LATENCY,
+    CONF_CONTROL_RESERVE,
+    CONF_HEDGE,
+    CONF_QUOTA_SHARE,
+    CONF_RETRIES,
+    DEFAULT_BURST_SIZE,
+    DEFAULT_CASSETTE,
+    DEFAULT_CASSETTE_LATENCY,
+    DEFAULT_CONTROL_RESERVE,
+    DEFAULT_HEDGE,
+    DEFAULT_QUOTA_SHARE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    HEDGE_PERCENTILE,
+    JSON_EXECUTOR_THRESHOLD,
+    LATENCY_MIN_SAMPLES,
+    LATENCY_SAMPLES,
+    LATENCY_TIMEOUT_FACTOR,
+    LATENCY_TIMEOUT_FLOOR,
+    MAX_CONCURRENT_REQUESTS,
+    PRIORITY_BACKGROUND,
+    RATE_LIMIT_DAILY_HEADER_PREFIX,
+    RATE_LIMIT_HEADER_PREFIXES,
+    REQUEST_PRIORITIES,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+    RETRY_PATHS,
+    RETRY_STATUS_CODES,
+)
+from .quota import GoveeAPIPollPlanner, GoveeAPIRateLimiter, GoveeAPIRequestLedger
+from .replay import GoveeAPIReplayBackend
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    json_loads = json.loads
+
+
+class GoveeCapability(TypedDict, total=False):
+    """Capability of a device - with parameters in the device list, with a state in state responses."""
+
+    type: str
+    instance: str
+    parameters: dict[str, Any]
+    state: dict[str, Any]
+    value: Any
+
+
+class GoveeDevice(TypedDict, total=False):
+    """Device of the user/devices response."""
+
+    sku: str
+    device: str
+    deviceName: str
+    type: str
+    capabilities: list[GoveeCapability]
+
+
+class GoveeDeviceState(TypedDict, total=False):
+    """Payload of the device/state response."""
+
+    sku: str
+    device: str
+    capabilities: list[GoveeCapability]
+
+
+class GoveeControlResult(TypedDict, total=False):
+    """Response of the device/control request."""
+
+    requestId: str
+    msg: str
+    code: int
+    capability: GoveeCapability
+
+
+class GoveeSceneOption(TypedDict):
+    """Scene of the device/scenes and device/diy-scenes responses."""
+
+    name: str
+    value: Any
+
+
+CIRCUIT_CLOSED: Final = "closed"
+CIRCUIT_OPEN: Final = "open"
+CIRCUIT_HALF_OPEN: Final = "half_open"
+
+
+class GoveeAPIStatus:
+    """Base class for API status objects that inform listeners about changes."""
+
+    def __init__(self) -> None:
+        """Initialize the listeners."""
+        self._listeners: list[Callable[[], None]] = []
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Listen for state changes - return a function to remove the listener."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def _notify(self) -> None:
+        """Inform the listeners about a change."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+class GoveeAPICircuitBreaker(GoveeAPIStatus):
+    """Circuit breaker shared by all requests of a config entry to the Govee cloud."""
+
+    def __init__(
+        self, entry_id: str, threshold: int = CIRCUIT_BREAKER_THRESHOLD, recovery: float = CIRCUIT_BREAKER_RECOVERY
+    ) -> None:
+        """Initialize the circuit breaker."""
+        super().__init__()
+        self._entry_id = entry_id
+        self._threshold = threshold
+        self._recovery = recovery
+        self._failures = 0
+        self._opened_at = 0.0
+        self.state = CIRCUIT_CLOSED
+
+    def _set_state(self, state: str) -> None:
+        """Change the state and inform the listeners."""
+        if state == self.state:
+            return
+        self.state = state
+        self._notify()
+
+    def allow_request(self) -> bool:
+        """Return True if a request may be sent - while open only a single probe passes per recovery time."""
+        if self.state == CIRCUIT_CLOSED:
+            return True
+        if time.monotonic() - self._opened_at < self._recovery:
+            return False
+        # open long enough, or the last probe never returned - let one probe through
+        _LOGGER.debug("%s - GoveeAPICircuitBreaker: sending probe request", self._entry_id)
+        self._opened_at = time.monotonic()
+        self._set_state(CIRCUIT_HALF_OPEN)
+        return True
+
+    def record_success(self) -> None:
+        """Record a request that reached the Govee cloud."""
+        self._failures = 0
+        if self.state != CIRCUIT_CLOSED:
+            _LOGGER.info("%s - GoveeAPICircuitBreaker: Govee API reachable again", self._entry_id)
+            self._set_state(CIRCUIT_CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a request that failed because the Govee cloud was unreachable or broken."""
+        self._failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or self._failures >= self._threshold:
+            if self.state == CIRCUIT_CLOSED:
+                _LOGGER.warning(
+                    "%s - GoveeAPICircuitBreaker: Govee API unreachable after %s failures - pausing requests",
+                    self._entry_id,
+                    self._failures,
+                )
+            self._opened_at = time.monotonic()
+            self._set_state(CIRCUIT_OPEN)
+
+
+class GoveeAPIRateLimit(GoveeAPIStatus):
+    """Server side view of the request quota taken from the rate-limit headers of the responses."""
+
+    def __init__(self, entry_id: str) -> None:
+        """Initialize the rate-limit state."""
+        super().__init__()
+        self._entry_id = entry_id
+        self.limit: int | None = None
+        self._remaining: int | None = None
+        self.reset: datetime | None = None
+        self.updated: datetime | None = None
+        # header prefix of the family the values were taken from
+        self.family: str | None = None
+
+    @staticmethod
+    def _parse_reset(value: str) -> datetime:
+        """Return the reset time of a header value - epoch seconds or milliseconds, or seconds from now."""
+        seconds = float(value)
+        if seconds > 1e12:
+            return dt_util.utc_from_timestamp(seconds / 1000)
+        if seconds > 1e9:
+            return dt_util.utc_from_timestamp(seconds)
+        return dt_util.utcnow() + timedelta(seconds=seconds)
+
+    @property
+    def remaining(self) -> int | None:
+        """Return the remaining requests reported by the server - None if unknown or past the reset time."""
+        if self.reset is not None and self.reset <= dt_util.utcnow():
+            return None
+        return self._remaining
+
+    @property
+    def daily(self) -> bool:
+        """Return True if the values describe the daily request quota."""
+        return self.family == RATE_LIMIT_DAILY_HEADER_PREFIX
+
+    def update(self, headers) -> None:
+        """Take the rate-limit values of the response headers - the daily X-RateLimit family wins."""
+        for prefix in RATE_LIMIT_HEADER_PREFIXES:
+            if prefix + "Remaining" in headers:
+                break
+        else:
+            return
+        if self.daily and prefix != self.family and self.remaining is not None:
+            # a fallback family does not replace daily values still valid
+            return
+        try:
+            remaining = int(headers[prefix + "Remaining"])
+            if prefix + "Limit" in headers:
+                limit = int(headers[prefix + "Limit"])
+            else:
+                limit = self.limit if prefix == self.family else None
+            reset = self._parse_reset(headers[prefix + "Reset"]) if prefix + "Reset" in headers else None
+        except ValueError:
+            _LOGGER.debug("%s - GoveeAPIRateLimit: invalid rate-limit headers: %s", self._entry_id, dict(headers))
+            return
+
+        self.updated = dt_util.utcnow()
+        changed = remaining != self._remaining or limit != self.limit
+        if reset is not None and (self.reset is None or abs((reset - self.reset).total_seconds()) > 1):
+            changed = True
+        self._remaining = remaining
+        self.limit = limit
+        self.reset = reset
+        self.family = prefix
+        if changed:
+            self._notify()
+
+
+class GoveeAPILatencyTracker:
+    """Latency percentiles per endpoint and the request timeouts derived from them."""
+
+    def __init__(
+        self,
+        entry_id: str,
+        samples: int = LATENCY_SAMPLES,
+        factor: float = LATENCY_TIMEOUT_FACTOR,
+        floor: float = LATENCY_TIMEOUT_FLOOR,
+    ) -> None:
+        """Initialize the latency tracker."""
+        self._entry_id = entry_id
+        self._samples = samples
+        self._factor = factor
+        self._floor = floor
+        self._latencies: dict[str, deque[float]] = {}
+
+    def record(self, endpoint: str, latency: float) -> None:
+        """Record the latency of a request that was answered."""
+        self._latencies.setdefault(endpoint.strip("/"), deque(maxlen=self._samples)).append(latency)
+
+    def record_timeout(self, endpoint: str, timeout: float) -> None:
+        """Record a timed out request - repeated timeouts widen the timeout of slow but healthy endpoints."""
+        _LOGGER.debug("%s - GoveeAPILatencyTracker: %s timed out after %.1f seconds", self._entry_id, endpoint, timeout)
+        self.record(endpoint, timeout)
+
+    def percentile(self, endpoint: str, percent: float) -> float | None:
+        """Return a latency percentile of an endpoint - None until enough requests were answered."""
+        latencies = self._latencies.get(endpoint.strip("/"))
+        if latencies is None or len(latencies) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(latencies)
+        # nearest rank
+        return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+    def timeout(self, endpoint: str, ceiling: float) -> float:
+        """Return the timeout for a request - p99 times the factor, clamped between the floor and the ceiling."""
+        p99 = self.percentile(endpoint, 99)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(self._floor, p99 * self._factor))
+
+    def as_dict(self, ceiling: float) -> dict[str, dict[str, float | None]]:
+        """Return the percentiles and timeouts of all endpoints."""
+        return {
+            endpoint: {
+                "samples": len(latencies),
+                "p50": self.percentile(endpoint, 50),
+                "p95": self.percentile(endpoint, 95),
+                "p99": self.percentile(endpoint, 99),
+                "timeout": self.timeout(endpoint, ceiling),
+            }
+            for endpoint, latencies in self._latencies.items()
+        }
+
+
+class GoveeAPIPriorityGate:
+    """Limit the concurrent requests of a config entry - waiting requests are let in by priority."""
+
+    def __init__(self, limit: int = MAX_CONCURRENT_REQUESTS) -> None:
+        """Initialize the gate."""
+        self._limit = limit
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def active(self) -> int:
+        """Return the number of requests in flight."""
+        return self._active
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Hold one of the request slots while the context is active."""
+        if self._active >= self._limit or self._waiters:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                # a slot handed over right before the cancellation goes to the next waiter
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        else:
+            self._active += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the slot over to the waiter with the highest priority or free it."""
+        while self._waiters:
+            future = heapq.heappop(self._waiters)[2]
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+
+class GoveeApiClient:
+    """Per config entry client owning the pooled HTTP session to the Govee OpenAPI.
+
+    Every request passes the circuit breaker and the rate limiter, is counted in the request ledger and - for the
+    paths in RETRY_PATHS - retried on transient failures.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, params) -> None:
+        """Initialize the client."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._headers = {
+            "Content-Type": "application/json",
+            CLOUD_API_HEADER_KEY: str(params.get(CONF_API_KEY, None)),
+        }
+        self._timeout = params.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+        self._base_url = (params.get(CONF_URL) or CLOUD_API_URL_OPENAPI).rstrip("/")
+        self._hedge = params.get(CONF_HEDGE, DEFAULT_HEDGE)
+        self._retries = params.get(CONF_RETRIES, DEFAULT_RETRIES)
+        self._session: aiohttp.ClientSession | None = None
+        self.circuit_breaker = GoveeAPICircuitBreaker(entry_id)
+        self.rate_limit = GoveeAPIRateLimit(entry_id)
+        self.latency = GoveeAPILatencyTracker(entry_id)
+        self.gate = GoveeAPIPriorityGate()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.replay = GoveeAPIReplayBackend(hass, entry_id)
+        self.ledger = GoveeAPIRequestLedger(hass, entry_id)
+        control_reserve = params.get(CONF_CONTROL_RESERVE, DEFAULT_CONTROL_RESERVE)
+        self.rate_limiter = GoveeAPIRateLimiter(
+            entry_id,
+            API_DAILY_LIMIT,
+            params.get(CONF_BURST_SIZE, DEFAULT_BURST_SIZE),
+            self.request_count,
+            control_reserve,
+        )
+        self.planner = GoveeAPIPollPlanner(
+            entry_id, API_DAILY_LIMIT, params.get(CONF_QUOTA_SHARE, DEFAULT_QUOTA_SHARE), control_reserve
+        )
+        self.cassette: GoveeAPICassette | None = None
+        cassette_mode = params.get(CONF_CASSETTE, DEFAULT_CASSETTE)
+        if cassette_mode in (CASSETTE_RECORD, CASSETTE_REPLAY):
+            self.cassette = GoveeAPICassette(
+                hass, entry_id, cassette_mode, params.get(CONF_CASSETTE_LATENCY, DEFAULT_CASSETTE_LATENCY)
+            )
+            _LOGGER.warning("%s - GoveeApiClient: cassette %s mode: %s", entry_id, cassette_mode, self.cassette.path)
+
+    @property
+    def timeout(self) -> float:
+        """Return the configured timeout - the ceiling of the adaptive request timeouts."""
+        return self._timeout
+
+    @property
+    def replaying(self) -> bool:
+        """Return True if the responses are replayed from the cassette instead of requested from the API."""
+        return self.cassette is not None and self.cassette.mode == CASSETTE_REPLAY
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the long-lived session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            _LOGGER.debug("%s - GoveeApiClient: creating pooled client session", self._entry_id)
+            self._session = async_create_clientsession(self._hass)
+        return self._session
+
+    @contextlib.asynccontextmanager
+    async def request(self, method: str, path: str, data: dict | None = None) -> AsyncIterator:
+        """Perform a request for an API path on the pooled session - recorded to or replayed from the cassette."""
+        if self.replaying:
+            # the recorded rate-limit headers describe the quota at recording time, not the current one
+            yield await self.cassette.async_play(method, path, data)
+            return
+
+        endpoint = path.strip("/")
+        timeout = self.latency.timeout(endpoint, self._timeout)
+        async with self.gate.slot(GoveeApiClient.priority(endpoint)):
+            started = time.monotonic()
+            try:
+                async with self.session.request(
+                    method,
+                    self._base_url + "/" + endpoint,
+                    json=data,
+                    headers=self._headers,
+                    timeout=aiohttp.ClientTimeout(total=timeout),
+                ) as response:
+                    latency = time.monotonic() - started
+                    self.latency.record(endpoint, latency)
+                    self.rate_limit.update(response.headers)
+                    if self.cassette is not None:
+                        # read the body here - the response keeps it for the caller
+                        body = await response.text()
+                        self.cassette.record(method, path, data, response.status, dict(response.headers), body, latency)
+                    yield response
+            except TimeoutError:
+                self.latency.record_timeout(endpoint, timeout)
+                raise
+
+    def single_flight(self, key: str, request: Callable[[], Awaitable]) -> Awaitable:
+        """Return the result of the request in flight for key - start the request only if none is running."""
+        task = self._in_flight.get(key)
+        if task is None:
+            # a background task - a slow cloud must not hold up the startup of Home Assistant
+            task = self._hass.async_create_background_task(request(), f"{self._entry_id} {key}")
+            self._in_flight[key] = task
+
+            def _done(_) -> None:
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+
+            task.add_done_callback(_done)
+        else:
+            _LOGGER.debug("%s - GoveeApiClient: joining request in flight: %s", self._entry_id, key)
+        # a cancelled caller must not cancel the request the other callers are waiting for
+        return asyncio.shield(task)
+
+    async def async_json(self, response):
+        """Async: Decode the json body of a response - large bodies are decoded in the executor"""
+        body = await response.read()
+        if len(body) > JSON_EXECUTOR_THRESHOLD:
+            _LOGGER.debug("%s - GoveeApiClient: decoding %s bytes in executor", self._entry_id, len(body))
+            return await self._hass.async_add_executor_job(json_loads, body)
+        return json_loads(body)
+
+    @staticmethod
+    def priority(path: str) -> int:
+        """Return the priority of a request - control before state refresh before background work."""
+        return REQUEST_PRIORITIES.get(path.strip("/"), PRIORITY_BACKGROUND)
+
+    @staticmethod
+    def _body(sku: str, device: str, **payload) -> dict:
+        """Return the body of a device request - the requestId is kept across retries of the request."""
+        return {"requestId": str(uuid.uuid4()), "payload": {"sku": str(sku), "device": str(device), **payload}}
+
+    @staticmethod
+    def retry_delay(attempt: int, status: int | None = None, retry_after: str | None = None) -> float | None:
+        """Return the delay in seconds before retrying a request - None if it should not be retried."""
+        if status is not None and status not in RETRY_STATUS_CODES:
+            return None
+
+        if retry_after is not None:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - dt_util.utcnow()).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return max(0.0, delay) if delay <= RETRY_BACKOFF_MAX else None
+
+        if status == 429:
+            # daily limit reached without a hint when to come back - a retry only burns quota
+            return None
+
+        # exponential backoff with jitter on the upper half of the backoff window
+        backoff = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2**attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    def request_count(self) -> int:
+        """Return the number of requests within the quota window - the server's view wins if it is higher."""
+        count = self.ledger.count()
+        # requests of other tools using the same API key only show up in the server's count
+        remaining = self.rate_limit.remaining
+        if self.rate_limit.daily and remaining is not None and self.rate_limit.limit is not None:
+            count = max(count, self.rate_limit.limit - remaining)
+        return count
+
+    def hedge_allowed(self) -> bool:
+        """Return True if the poll plan leaves spare request budget for a hedged request."""
+        return self.planner.has_spare(self.request_count(), self.ledger.window)
+
+    def _record_status(self, status: int) -> None:
+        """Feed the status of a response to the circuit breaker - server errors count as failures."""
+        if status >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    async def _async_admit(self, path: str, wait: bool) -> bool:
+        """Async: Pass a request through the circuit breaker and the rate limiter and count it - False if dropped"""
+        if not self.circuit_breaker.allow_request():
+            _LOGGER.debug("%s - GoveeApiClient: circuit open - %s skipped", self._entry_id, path)
+            return False
+        if self.replaying:
+            # replayed requests spend no quota - neither a token nor an entry in the persistent ledger
+            return True
+        if not await self.rate_limiter.async_acquire(wait, priority=GoveeApiClient.priority(path)):
+            _LOGGER.warning("%s - GoveeApiClient: request quota exhausted - %s dropped", self._entry_id, path)
+            return False
+        self.ledger.record(path)
+        _LOGGER.debug("%s - GoveeApiClient: counted request %s -> %s", self._entry_id, path, self.ledger.count())
+        return True
+
+    async def async_get(self, path: str, wait: bool = True):
+        """Async: Perform a GET request - return the data of the response or None on errors"""
+        try:
+            if self.replay.enabled:
+                _LOGGER.debug("%s - GoveeApiClient: load debug file: %s", self._entry_id, self.replay.path)
+                return await self.replay.async_devices()
+        except Exception as e:
+            _LOGGER.error(
+                "%s - GoveeApiClient: debug file load failed: %s (%s.%s)",
+                self._entry_id,
+                str(e),
+                e.__class__.__module__,
+                type(e).__name__,
+            )
+            return None
+
+        try:
+            if not await self._async_admit(path, wait):
+                return None
+            async with self.request("GET", path) as r:
+                self._record_status(r.status)
+                if r.status == 429:
+                    _LOGGER.error(
+                        "%s - GoveeApiClient: Too many API requests - limit is 10000/Account/Day", self._entry_id
+                    )
+                    return None
+                elif r.status == 401:
+                    _LOGGER.error("%s - GoveeApiClient: Unauthorized - check your APIKey", self._entry_id)
+                    return None
+                elif r.status != 200:
+                    text = await r.text()
+                    _LOGGER.error("%s - GoveeApiClient: GET %s failed: %s", self._entry_id, path, text)
+                    return None
+
+                return (await self.async_json(r))["data"]
+
+        except (TimeoutError, aiohttp.ClientConnectionError, aiohttp.ServerDisconnectedError):
+            self.circuit_breaker.record_failure()
+            _LOGGER.warning("%s - GoveeApiClient: Govee API unreachable, will retry on next poll", self._entry_id)
+            return None
+        except Exception as e:
+            _LOGGER.error(
+                "%s - GoveeApiClient: GET %s failed: %s (%s.%s)",
+                self._entry_id,
+                path,
+                str(e),
+                e.__class__.__module__,
+                type(e).__name__,
+            )
+            return None
+
+    async def async_post(self, path: str, data: dict, return_status_code: bool = False, wait: bool = True):
+        """Async: Perform a POST request - return the response or None (the status code if requested) on errors"""
+        try:
+            _LOGGER.debug("%s - GoveeApiClient: POST %s data = %s", self._entry_id, path, data)
+            retries = self._retries if path.strip("/") in RETRY_PATHS else 0
+
+            for attempt in range(retries + 1):
+                if not await self._async_admit(path, wait):
+                    return None
+                retry_delay = None
+                try:
+                    async with self.request("POST", path, data) as r:
+                        self._record_status(r.status)
+                        if attempt < retries:
+                            retry_delay = GoveeApiClient.retry_delay(attempt, r.status, r.headers.get("Retry-After"))
+                        if retry_delay is None:
+                            if r.status == 429:
+                                _LOGGER.error(
+                                    "%s - GoveeApiClient: Too many API requests - limit is 10000/Account/Day",
+                                    self._entry_id,
+                                )
+                                return r.status if return_status_code else None
+                            elif r.status == 401:
+                                _LOGGER.error("%s - GoveeApiClient: Unauthorized - check your APIKey", self._entry_id)
+                                return r.status if return_status_code else None
+                            elif r.status != 200:
+                                text = await r.text()
+                                _LOGGER.error(
+                                    "%s - GoveeApiClient: POST %s failed status_code: %s", self._entry_id, path, text
+                                )
+                                return r.status if return_status_code else None
+
+                            return await self.async_json(r)
+                        retry_reason = f"status {r.status}"
+                except (TimeoutError, aiohttp.ClientConnectionError, aiohttp.ServerDisconnectedError) as e:
+                    self.circuit_breaker.record_failure()
+                    if attempt >= retries:
+                        raise
+                    retry_delay = GoveeApiClient.retry_delay(attempt)
+                    retry_reason = type(e).__name__
+
+                _LOGGER.info(
+                    "%s - GoveeApiClient: %s failed (%s) - retry %s/%s in %.1f seconds",
+                    self._entry_id,
+                    path,
+                    retry_reason,
+                    attempt + 1,
+                    retries,
+                    retry_delay,
+                )
+                await asyncio.sleep(retry_delay)
+
+        except (TimeoutError, aiohttp.ClientConnectionError, aiohttp.ServerDisconnectedError):
+            _LOGGER.warning("%s - GoveeApiClient: Govee API unreachable, will retry on next poll", self._entry_id)
+            return None
+        except Exception as e:
+            _LOGGER.error(
+                "%s - GoveeApiClient: POST %s failed: %s (%s.%s)",
+                self._entry_id,
+                path,
+                str(e),
+                e.__class__.__module__,
+                type(e).__name__,
+            )
+            return None
+
+    async def async_get_devices(self, wait: bool = True) -> list[GoveeDevice] | None:
+        """Async: Return the devices of the account"""
+        return await self.async_get("user/devices", wait)
+
+    async def async_get_state(self, sku: str, device: str, wait: bool = True) -> GoveeDeviceState | None:
+        """Async: Return the current state of a device - hedged if enabled"""
+        request = functools.partial(self.async_post, "device/state", self._body(sku, device), wait=wait)
+        delay = self.latency.percentile("device/state", HEDGE_PERCENTILE) if self._hedge else None
+        if delay is None:
+            r = await request()
+        else:
+            r = await self._async_hedged(request, delay, self.hedge_allowed)
+        if not isinstance(r, dict):
+            return None
+        return r.get("payload")
+
+    async def _async_hedged(self, request: Callable[[], Awaitable], delay: float, allowed: Callable[[], bool]):
+        """Async: Send a duplicate request if the first one is not answered within delay - the first answer wins"""
+        # background tasks - hedging kicks in when the cloud is slow, which must not hold up the startup
+        tasks = {self._hass.async_create_background_task(request(), f"{self._entry_id} request")}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not allowed():
+                return await next(iter(tasks))
+            _LOGGER.debug(
+                "%s - GoveeApiClient: no answer within %.2f seconds - sending hedged request", self._entry_id, delay
+            )
+            tasks.add(self._hass.async_create_background_task(request(), f"{self._entry_id} hedged request"))
+            result = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if isinstance(result, dict):
+                        return result
+            return result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def async_control(
+        self, sku: str, device: str, capability: GoveeCapability, return_status_code: bool = False
+    ) -> GoveeControlResult | int | None:
+        """Async: Send a capability command to a device - return the status code on errors if requested"""
+        return await self.async_post(
+            "device/control", self._body(sku, device, capability=capability), return_status_code
+        )
+
+    async def _async_get_scene_options(self, path: str, sku: str, device: str, instance: str) -> list[GoveeSceneOption]:
+        """Async: Return the scene options of a capability instance of a scenes response"""
+        r = await self.async_post(path, self._body(sku, device))
+        if not isinstance(r, dict) or r.get("code") != 200:
+            return []
+        for capability in r.get("payload", {}).get("capabilities", []):
+            if capability.get("instance") == instance:
+                return capability.get("parameters", {}).get("options", [])
+        return []
+
+    async def async_get_scenes(self, sku: str, device: str) -> list[GoveeSceneOption]:
+        """Async: Return the dynamic scenes of a device"""
+        return await self._async_get_scene_options("device/scenes", sku, device, "lightScene")
+
+    async def async_get_diy_scenes(self, sku: str, device: str) -> list[GoveeSceneOption]:
+        """Async: Return the DIY scenes of a device"""
+        return await self._async_get_scene_options("device/diy-scenes", sku, device, "diyScene")
+
+    async def async_close(self) -> None:
+        """Close the pooled session."""
+        for task in self._in_flight.values():
+            task.cancel()
+        self._in_flight.clear()
+        if self.cassette is not None:
+            await self.cassette.async_close()
+        if self._session is not None and not self._session.closed:
+            _LOGGER.debug("%s - GoveeApiClient: closing pooled client session", self._entry_id)
+            await self._session.close()
+        self._session = None
@@ -15,13 +15,14 @@ from homeassistant.const import (
     CONF_DEVICES,
     STATE_UNKNOWN,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 
 from .const import (
     CONF_COORDINATORS,
     DOMAIN,
 )
 from .entities import GoveeLifePlatformEntity
+from .state import capability_key
 from .utils import GoveeAPI_GetCachedStateValue
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -116,15 +117,11 @@ class GoveeLifeBinarySensor(BinarySensorEntity, GoveeLifePlatformEntity):
         cap = kwargs.get("cap")
         self._capability_type = cap.get("type")
         self._capability_name = cap.get("instance")
+        self._capabilities = {capability_key(self._capability_type, self._capability_name)}
         self.uniqueid = self._identifier + "_" + self._entity_id + "_" + self._capability_name
         self._name = self._capability_name
         self._attr_device_class = _EVENT_DEVICE_CLASS_MAP.get(self._capability_name)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self.async_write_ha_state()
-
     @property
     def is_on(self) -> bool | None:
         """Return True if the event is active (e.g. water full)."""
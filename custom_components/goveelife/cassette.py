@@ -0,0 +1,143 @@
+"""HTTP cassette record/replay for the Govee Life integration."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Final
+
+from homeassistant.core import HomeAssistant
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from .const import DOMAIN
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class GoveeAPICassetteResponse:
+    """Recorded response with the subset of the aiohttp response interface used by the integration."""
+
+    def __init__(self, status: int, headers: dict, body: str) -> None:
+        """Initialize the response."""
+        self.status = status
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self._body = body
+
+    async def read(self) -> bytes:
+        """Async: Return the body as bytes"""
+        return self._body.encode()
+
+    async def text(self) -> str:
+        """Async: Return the body as text"""
+        return self._body
+
+    async def json(self):
+        """Async: Return the body decoded from json"""
+        return json.loads(self._body)
+
+
+class GoveeAPICassette:
+    """Record request/response pairs with their timing to a JSON lines file, or serve them back."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, mode: str, latency_scale: float = 1.0, path: str | None = None
+    ) -> None:
+        """Initialize the cassette."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self.mode = mode
+        self._latency_scale = latency_scale
+        self._path = path or hass.config.path(f"{DOMAIN}.{entry_id}.cassette.jsonl")
+        self._lock = asyncio.Lock()
+        self._pending: list[str] = []
+        self._flush_task: asyncio.Task | None = None
+        self._tracks: dict[str, list[dict]] | None = None
+        self._positions: dict[str, int] = {}
+
+    @property
+    def path(self) -> str:
+        """Return the path of the cassette file."""
+        return self._path
+
+    @staticmethod
+    def track(method: str, path: str, data: dict | None) -> str:
+        """Return the key recorded responses are matched by - the requestId differs on every request."""
+        payload = {k: v for k, v in (data or {}).items() if k != "requestId"}
+        return method + " " + path.strip("/") + " " + json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+    def record(
+        self, method: str, path: str, data: dict | None, status: int, headers: dict, body: str, latency: float
+    ) -> None:
+        """Queue a request/response pair for writing to the cassette file."""
+        self._pending.append(
+            json.dumps(
+                {
+                    "t": round(time.time(), 3),
+                    "method": method,
+                    "path": path.strip("/"),
+                    "request": data,
+                    "status": status,
+                    "headers": headers,
+                    "body": body,
+                    "latency": round(latency, 4),
+                },
+                separators=(",", ":"),
+            )
+        )
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = self._hass.async_create_task(self._async_flush(), f"{self._entry_id} cassette flush")
+
+    def _append(self, lines: list[str]) -> None:
+        """Append lines to the cassette file."""
+        with open(self._path, "a", encoding="utf-8") as stream:
+            stream.write("\n".join(lines) + "\n")
+
+    async def _async_flush(self) -> None:
+        """Async: Write the queued interactions off the event loop"""
+        while self._pending:
+            lines, self._pending = self._pending, []
+            await self._hass.async_add_executor_job(self._append, lines)
+
+    async def async_close(self) -> None:
+        """Async: Write the interactions still queued"""
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._async_flush()
+
+    def _load(self) -> dict[str, list[dict]]:
+        """Read the cassette file and group the interactions by track."""
+        tracks: dict[str, list[dict]] = {}
+        if not os.path.isfile(self._path):
+            return tracks
+        with open(self._path, encoding="utf-8") as stream:
+            for line in stream:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                key = GoveeAPICassette.track(interaction["method"], interaction["path"], interaction["request"])
+                tracks.setdefault(key, []).append(interaction)
+        return tracks
+
+    async def async_play(self, method: str, path: str, data: dict | None) -> GoveeAPICassetteResponse:
+        """Async: Serve the next recorded response of a request - after its recorded latency times the scale"""
+        async with self._lock:
+            if self._tracks is None:
+                self._tracks = await self._hass.async_add_executor_job(self._load)
+                _LOGGER.debug(
+                    "%s - GoveeAPICassette: loaded %s tracks from %s", self._entry_id, len(self._tracks), self._path
+                )
+        key = GoveeAPICassette.track(method, path, data)
+        interactions = self._tracks.get(key)
+        if not interactions:
+            _LOGGER.warning("%s - GoveeAPICassette: no recording for %s %s", self._entry_id, method, path)
+            return GoveeAPICassetteResponse(404, {}, json.dumps({"code": 404, "msg": "not recorded"}))
+        # replay the recordings in order, starting over when all were served
+        position = self._positions.get(key, 0)
+        self._positions[key] = position + 1
+        interaction = interactions[position % len(interactions)]
+        if self._latency_scale > 0:
+            await asyncio.sleep(interaction["latency"] * self._latency_scale)
+        return GoveeAPICassetteResponse(interaction["status"], interaction["headers"], interaction["body"])
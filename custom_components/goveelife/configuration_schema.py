@@ -12,13 +12,35 @@ from homeassistant.const import (
     CONF_FRIENDLY_NAME,
     CONF_SCAN_INTERVAL,
     CONF_TIMEOUT,
+    CONF_URL,
 )
 
 from .const import (
+    CASSETTE_MODES,
+    CLOUD_API_URL_OPENAPI,
+    CONF_BURST_SIZE,
+    CONF_CASSETTE,
+    CONF_CASSETTE_LATENCY,
+    CONF_CONTROL_RESERVE,
+    CONF_HEDGE,
+    CONF_OPTIMISTIC_WINDOW,
+    CONF_QUOTA_SHARE,
+    CONF_RETRIES,
+    CONF_STARTUP_CONCURRENCY,
+    DEFAULT_BURST_SIZE,
+    DEFAULT_CASSETTE,
+    DEFAULT_CASSETTE_LATENCY,
+    DEFAULT_CONTROL_RESERVE,
+    DEFAULT_HEDGE,
     DEFAULT_NAME,
+    DEFAULT_OPTIMISTIC_WINDOW,
     DEFAULT_POLL_INTERVAL,
+    DEFAULT_QUOTA_SHARE,
+    DEFAULT_RETRIES,
+    DEFAULT_STARTUP_CONCURRENCY,
     DEFAULT_TIMEOUT,
     DOMAIN,
+    MAX_CONCURRENT_REQUESTS,
 )
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -29,6 +51,26 @@ GOVEELIFE_SCHEMA: Final = vol.Schema(
         vol.Required(CONF_API_KEY, default=None): cv.string,
         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_POLL_INTERVAL): cv.positive_int,
         vol.Optional(CONF_TIMEOUT, default=DEFAULT_TIMEOUT): cv.positive_int,
+        vol.Optional(CONF_BURST_SIZE, default=DEFAULT_BURST_SIZE): cv.positive_int,
+        vol.Optional(CONF_QUOTA_SHARE, default=DEFAULT_QUOTA_SHARE): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+        vol.Optional(CONF_CONTROL_RESERVE, default=DEFAULT_CONTROL_RESERVE): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=50)
+        ),
+        vol.Optional(CONF_RETRIES, default=DEFAULT_RETRIES): vol.All(vol.Coerce(int), vol.Range(min=0, max=5)),
+        vol.Optional(CONF_HEDGE, default=DEFAULT_HEDGE): cv.boolean,
+        vol.Optional(CONF_OPTIMISTIC_WINDOW, default=DEFAULT_OPTIMISTIC_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=600)
+        ),
+        vol.Optional(CONF_STARTUP_CONCURRENCY, default=DEFAULT_STARTUP_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_CONCURRENT_REQUESTS)
+        ),
+        vol.Optional(CONF_URL, default=CLOUD_API_URL_OPENAPI): cv.url,
+        vol.Optional(CONF_CASSETTE, default=DEFAULT_CASSETTE): vol.In(CASSETTE_MODES),
+        vol.Optional(CONF_CASSETTE_LATENCY, default=DEFAULT_CASSETTE_LATENCY): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
     }
 )
 
@@ -43,7 +85,7 @@ async def async_get_OPTIONS_GOVEELIFE_SCHEMA(current_data):
         scan_interval_desc = vol.Optional(
             CONF_SCAN_INTERVAL,
             default=current_data.get(CONF_SCAN_INTERVAL, DEFAULT_POLL_INTERVAL),
-            description="Poll interval in seconds. API limit: 10,000 requests/day. Recommended: 300s (5min) for 20+ devices",
+            description="Minimum poll interval in seconds. It is stretched automatically to keep the projected requests within the quota share of the 10,000 requests/day API limit",
         )
 
         OPTIONS_GOVEELIFE_SCHEMA: Final = vol.Schema(
@@ -52,6 +94,33 @@ async def async_get_OPTIONS_GOVEELIFE_SCHEMA(current_data):
                 vol.Required(CONF_API_KEY, default=current_data.get(CONF_API_KEY)): cv.string,
                 scan_interval_desc: cv.positive_int,
                 vol.Optional(CONF_TIMEOUT, default=current_data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)): cv.positive_int,
+                vol.Optional(
+                    CONF_BURST_SIZE, default=current_data.get(CONF_BURST_SIZE, DEFAULT_BURST_SIZE)
+                ): cv.positive_int,
+                vol.Optional(
+                    CONF_QUOTA_SHARE, default=current_data.get(CONF_QUOTA_SHARE, DEFAULT_QUOTA_SHARE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                vol.Optional(
+                    CONF_CONTROL_RESERVE, default=current_data.get(CONF_CONTROL_RESERVE, DEFAULT_CONTROL_RESERVE)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=50)),
+                vol.Optional(CONF_RETRIES, default=current_data.get(CONF_RETRIES, DEFAULT_RETRIES)): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=5)
+                ),
+                vol.Optional(CONF_HEDGE, default=current_data.get(CONF_HEDGE, DEFAULT_HEDGE)): cv.boolean,
+                vol.Optional(
+                    CONF_OPTIMISTIC_WINDOW, default=current_data.get(CONF_OPTIMISTIC_WINDOW, DEFAULT_OPTIMISTIC_WINDOW)
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
+                vol.Optional(
+                    CONF_STARTUP_CONCURRENCY,
+                    default=current_data.get(CONF_STARTUP_CONCURRENCY, DEFAULT_STARTUP_CONCURRENCY),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_CONCURRENT_REQUESTS)),
+                vol.Optional(CONF_URL, default=current_data.get(CONF_URL, CLOUD_API_URL_OPENAPI)): cv.url,
+                vol.Optional(CONF_CASSETTE, default=current_data.get(CONF_CASSETTE, DEFAULT_CASSETTE)): vol.In(
+                    CASSETTE_MODES
+                ),
+                vol.Optional(
+                    CONF_CASSETTE_LATENCY, default=current_data.get(CONF_CASSETTE_LATENCY, DEFAULT_CASSETTE_LATENCY)
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
             }
         )
         return OPTIONS_GOVEELIFE_SCHEMA
@@ -12,13 +12,63 @@ STATE_DEBUG_FILENAME: Final = "/_diagnostics.json"
 
 DEFAULT_TIMEOUT: Final = 10
 DEFAULT_POLL_INTERVAL: Final = 60
+DEFAULT_BURST_SIZE: Final = 200
+DEFAULT_QUOTA_SHARE: Final = 80
+DEFAULT_RETRIES: Final = 2
+DEFAULT_CONTROL_RESERVE: Final = 15
+DEFAULT_HEDGE: Final = False
+DEFAULT_CASSETTE: Final = "off"
+DEFAULT_CASSETTE_LATENCY: Final = 1.0
+DEFAULT_RATE_LIMIT_MAX_WAIT: Final = 30
+DEFAULT_OPTIMISTIC_WINDOW: Final = 60
+DEFAULT_STARTUP_CONCURRENCY: Final = 4
 DEFAULT_NAME: Final = "GoveeLife"
 EVENT_PROPS_ID: Final = DOMAIN + "_property_message"
+EVENT_OPTIMISTIC_ROLLBACK: Final = DOMAIN + "_optimistic_rollback"
 
 CONF_COORDINATORS: Final = "coordinators"
-CONF_API_COUNT: Final = "api_count"
+CONF_CASSETTE: Final = "cassette"
+CONF_CASSETTE_LATENCY: Final = "cassette_latency"
+CONF_API_CLIENT: Final = "api_client"
+CONF_BURST_SIZE: Final = "burst_size"
+CONF_QUOTA_SHARE: Final = "quota_share"
+CONF_RETRIES: Final = "retries"
+CONF_CONTROL_RESERVE: Final = "control_reserve"
+CONF_HEDGE: Final = "hedge_requests"
+CONF_STATE_LOCKS: Final = "state_locks"
+CONF_OPTIMISTIC_WINDOW: Final = "optimistic_window"
+CONF_STATE_SNAPSHOT: Final = "state_snapshot"
+CONF_STARTUP_CONCURRENCY: Final = "startup_concurrency"
 CONF_ENTRY_ID: Final = "entry_id"
 
 CLOUD_API_URL_DEVELOPER: Final = "https://developer-api.govee.com/v1/appliance/devices/"
 CLOUD_API_URL_OPENAPI: Final = "https://openapi.api.govee.com/router/api/v1"
 CLOUD_API_HEADER_KEY: Final = "Govee-API-Key"
+API_DAILY_LIMIT: Final = 10000
+API_QUOTA_WINDOW: Final = 86400
+PRIORITY_CONTROL: Final = 0
+PRIORITY_STATE: Final = 1
+PRIORITY_BACKGROUND: Final = 2
+REQUEST_PRIORITIES: Final = {"device/control": PRIORITY_CONTROL, "device/state": PRIORITY_STATE}
+MAX_CONCURRENT_REQUESTS: Final = 8
+# Seconds between the starts of the first refreshes of the devices after setup
+STARTUP_REFRESH_STAGGER: Final = 0.5
+RETRY_PATHS: Final = ["device/state", "device/control"]
+RETRY_STATUS_CODES: Final = [429, 500, 502, 503, 504]
+RETRY_BACKOFF_BASE: Final = 1
+RETRY_BACKOFF_MAX: Final = 30
+CIRCUIT_BREAKER_THRESHOLD: Final = 5
+CIRCUIT_BREAKER_RECOVERY: Final = 60
+JSON_EXECUTOR_THRESHOLD: Final = 65536
+LATENCY_SAMPLES: Final = 100
+LATENCY_MIN_SAMPLES: Final = 20
+LATENCY_TIMEOUT_FACTOR: Final = 3
+LATENCY_TIMEOUT_FLOOR: Final = 2
+HEDGE_PERCENTILE: Final = 95
+RATE_LIMIT_DAILY_HEADER_PREFIX: Final = "X-RateLimit-"
+RATE_LIMIT_HEADER_PREFIXES: Final = [RATE_LIMIT_DAILY_HEADER_PREFIX, "API-RateLimit-"]
+
+CASSETTE_OFF: Final = "off"
+CASSETTE_RECORD: Final = "record"
+CASSETTE_REPLAY: Final = "replay"
+CASSETTE_MODES: Final = [CASSETTE_OFF, CASSETTE_RECORD, CASSETTE_REPLAY]
@@ -19,6 +19,7 @@ from homeassistant.const import (
 from homeassistant.core import HomeAssistant
 
 from .const import (
+    CONF_API_CLIENT,
     DOMAIN,
 )
 
@@ -72,7 +73,9 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
         _LOGGER.debug(
             "%s - async_get_config_entry_diagnostics %s: Add cloud received device states", entry.entry_id, platform
         )
-        diag["cloud_states"] = async_redact_data(entry_data[CONF_STATE], REDACT_CLOUD_STATES)
+        diag["cloud_states"] = async_redact_data(
+            {device: state.as_api_json() for device, state in entry_data[CONF_STATE].items()}, REDACT_CLOUD_STATES
+        )
     except Exception as e:
         _LOGGER.error(
             "%s - async_get_config_entry_diagnostics %s: Add cloud received device states: %s (%s.%s)",
@@ -84,6 +87,48 @@ async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigE
         )
         # return False
 
+    try:
+        _LOGGER.debug(
+            "%s - async_get_config_entry_diagnostics %s: Add api requests of the quota window", entry.entry_id, platform
+        )
+        diag["api_requests"] = entry_data[CONF_API_CLIENT].ledger.counts()
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_get_config_entry_diagnostics %s: Add api requests of the quota window failed: %s (%s.%s)",
+            entry.entry_id,
+            platform,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+        # return False
+
+    try:
+        _LOGGER.debug(
+            "%s - async_get_config_entry_diagnostics %s: Add api rate-limit headers and latencies",
+            entry.entry_id,
+            platform,
+        )
+        rate_limit = entry_data[CONF_API_CLIENT].rate_limit
+        diag["api_rate_limit"] = {
+            "limit": rate_limit.limit,
+            "remaining": rate_limit.remaining,
+            "reset": rate_limit.reset.isoformat() if rate_limit.reset else None,
+            "updated": rate_limit.updated.isoformat() if rate_limit.updated else None,
+        }
+        client = entry_data[CONF_API_CLIENT]
+        diag["api_latency"] = client.latency.as_dict(client.timeout)
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_get_config_entry_diagnostics %s: Add api rate-limit headers and latencies failed: %s (%s.%s)",
+            entry.entry_id,
+            platform,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+        # return False
+
     try:
         _LOGGER.debug(
             "%s - async_get_config_entry_diagnostics %s: Add python module [goveelife] version",
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import os
 from datetime import timedelta
 from typing import Final
 
@@ -27,11 +26,15 @@ from homeassistant.helpers.entity import (
 from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator
 
 from .const import (
+    CONF_RETRIES,
     DEFAULT_NAME,
+    DEFAULT_RATE_LIMIT_MAX_WAIT,
+    DEFAULT_RETRIES,
     DOMAIN,
-    STATE_DEBUG_FILENAME,
+    RETRY_BACKOFF_MAX,
 )
-from .utils import async_GoveeAPI_GetDeviceState
+from .state import ONLINE_KEY, CapabilityKey
+from .utils import GoveeAPI_CheckPollPlan, GoveeAPI_GetReplayBackend, async_GoveeAPI_GetDeviceState
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -39,6 +42,9 @@ _LOGGER: Final = logging.getLogger(__name__)
 class GoveeLifePlatformEntity(CoordinatorEntity, Entity):
     """Base class for Govee Life integration."""
 
+    # capabilities the state of the entity depends on - None for all capabilities of the device
+    _capabilities: set[CapabilityKey] | None = None
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, coordinator, device_cfg, **kwargs) -> None:
         """Initialize the entity."""
         try:
@@ -128,6 +134,10 @@ class GoveeLifePlatformEntity(CoordinatorEntity, Entity):
     @property
     def extra_state_attributes(self):
         """Return the state attributes of the entity."""
+        state = self.hass.data[DOMAIN][self._entry_id].get(CONF_STATE, {}).get(self._device_cfg.get("device"))
+        if state is not None and state.stale:
+            # restored from the snapshot of the last run - not yet refreshed
+            return {**self._attributes, "stale": True}
         return self._attributes
 
     @property
@@ -142,13 +152,7 @@ class GoveeLifePlatformEntity(CoordinatorEntity, Entity):
         try:
             entry_data = self.hass.data[DOMAIN][self._entry_id]
             d = self._device_cfg.get("device")
-            capabilities = entry_data[CONF_STATE][d].get("capabilities", [])
-            value = False
-            for cap in capabilities:
-                if cap["type"] == "devices.capabilities.online":
-                    cap_state = cap.get("state", None)
-                    if cap_state is not None:
-                        value = cap_state.get("value", False)
+            value = entry_data[CONF_STATE][d].online
             # _LOGGER.debug("%s - %s: available result: %s", self._api_id, self._identifier, value)
             return value
         except KeyError:
@@ -178,6 +182,12 @@ class GoveeLifePlatformEntity(CoordinatorEntity, Entity):
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         # _LOGGER.debug("%s - %s: _handle_coordinator_update", self._api_id, self._identifier)
+        changed = self.coordinator.changed
+        if changed is not None:
+            if not changed:
+                return
+            if self._capabilities is not None and ONLINE_KEY not in changed and changed.isdisjoint(self._capabilities):
+                return
         self.async_write_ha_state()
 
 
@@ -192,13 +202,39 @@ class GoveeAPIUpdateCoordinator(DataUpdateCoordinator):
         super().__init__(hass, _LOGGER, name=self._identifier, update_interval=timedelta(seconds=scan_interval))
         self._entry_id = entry_id
         self._device_cfg = device_cfg
+        # keys of the capabilities changed by the last refresh - None if unknown
+        self.changed: set[CapabilityKey] | None = None
+        # wait for a request token instead of dropping the poll
+        self._wait = False
+
+    async def async_first_refresh(self) -> None:
+        """Refresh waiting for a request token - a dropped first poll leaves the entities unavailable for an interval."""
+        self._wait = True
+        try:
+            await self.async_refresh()
+        finally:
+            self._wait = False
 
     async def _async_update_data(self):
         """Fetch data from the API endpoint."""
         try:
             entry_data = self.hass.data[DOMAIN][self._entry_id]
-            async with asyncio.timeout(entry_data[CONF_PARAMS][CONF_TIMEOUT]):
-                result = await async_GoveeAPI_GetDeviceState(self.hass, self._entry_id, self._device_cfg, True)
+            # leave room for the retries of the state request and their backoff
+            retries = entry_data[CONF_PARAMS].get(CONF_RETRIES, DEFAULT_RETRIES)
+            timeout = entry_data[CONF_PARAMS][CONF_TIMEOUT] * (retries + 1) + RETRY_BACKOFF_MAX * retries
+            if self._wait:
+                timeout += DEFAULT_RATE_LIMIT_MAX_WAIT
+            states = entry_data.setdefault(CONF_STATE, {})
+            previous = states.get(self._device_cfg.get("device"))
+            self.changed = set()
+            async with asyncio.timeout(timeout):
+                result = await async_GoveeAPI_GetDeviceState(
+                    self.hass, self._entry_id, self._device_cfg, True, wait=self._wait
+                )
+            current = states.get(self._device_cfg.get("device"))
+            if current is not previous:
+                # a restored state differs from a refreshed one in its stale attribute on every entity
+                self.changed = None if previous is None or previous.stale else current.changed(previous)
         except TimeoutError:
             _LOGGER.warning(
                 "%s - GoveeAPIUpdateCoordinator: Govee API unreachable (timeout), will retry on next poll",
@@ -217,15 +253,15 @@ class GoveeAPIUpdateCoordinator(DataUpdateCoordinator):
 
         try:
             scan_interval = entry_data.get(CONF_SCAN_INTERVAL)
-            debug_file = os.path.dirname(os.path.realpath(__file__)) + STATE_DEBUG_FILENAME
-            if os.path.isfile(debug_file) and scan_interval is None:
+            if GoveeAPI_GetReplayBackend(self.hass, self._entry_id).enabled and scan_interval is None:
                 scan_interval = 3600
                 _LOGGER.info("%s - GoveeAPIUpdateCoordinator: debug poll interval is %s seconds", DOMAIN, scan_interval)
 
-            if scan_interval is not None:
                 scan_interval = timedelta(seconds=scan_interval)
                 if scan_interval != self.update_interval:
                     self.update_interval = scan_interval
+            else:
+                GoveeAPI_CheckPollPlan(self.hass, self._entry_id)
         except Exception as e:
             _LOGGER.warning(
                 "%s - GoveeAPIUpdateCoordinator: _async_update_data update interval change failed: %s (%s.%s)",
@@ -0,0 +1,285 @@
+"""Request quota handling for the Govee Life integration."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Final
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    API_DAILY_LIMIT,
+    API_QUOTA_WINDOW,
+    DEFAULT_BURST_SIZE,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_QUOTA_SHARE,
+    DEFAULT_RATE_LIMIT_MAX_WAIT,
+    DOMAIN,
+    PRIORITY_CONTROL,
+    PRIORITY_STATE,
+)
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+LEDGER_STORAGE_VERSION: Final = 1
+LEDGER_SAVE_DELAY: Final = 60
+
+
+class GoveeAPIRequestLedger:
+    """Persistent rolling window of Govee API request timestamps per endpoint."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, window: float = API_QUOTA_WINDOW) -> None:
+        """Initialize the request ledger."""
+        self._entry_id = entry_id
+        self._window = window
+        self._store = Store(hass, LEDGER_STORAGE_VERSION, GoveeAPIRequestLedger.storage_key(entry_id))
+        self._requests: dict[str, deque[float]] = {}
+        self._save_pending = False
+
+    @staticmethod
+    def storage_key(entry_id: str) -> str:
+        """Return the storage key of the ledger of a config entry."""
+        return f"{DOMAIN}.{entry_id}.requests"
+
+    @property
+    def window(self) -> float:
+        """Return the length of the rolling window in seconds."""
+        return self._window
+
+    async def async_load(self) -> None:
+        """Async: Load the persisted request timestamps."""
+        data = await self._store.async_load() or {}
+        for endpoint, stamps in data.get("requests", {}).items():
+            self._requests[endpoint] = deque(sorted(stamps))
+        self._prune(time.time())
+        _LOGGER.debug("%s - GoveeAPIRequestLedger: loaded %s requests of the last window", self._entry_id, self.count())
+
+    async def async_flush(self) -> None:
+        """Async: Write the request timestamps right away."""
+        await self._store.async_save(self._data_to_save())
+
+    def _prune(self, now: float) -> None:
+        """Drop the timestamps that left the rolling window."""
+        horizon = now - self._window
+        for stamps in self._requests.values():
+            while stamps and stamps[0] <= horizon:
+                stamps.popleft()
+
+    def record(self, endpoint: str) -> None:
+        """Record a request to an endpoint and schedule a write within LEDGER_SAVE_DELAY."""
+        now = time.time()
+        self._requests.setdefault(endpoint.strip("/"), deque()).append(now)
+        self._prune(now)
+        # the scheduled write picks up this request - rescheduling would postpone it while requests keep coming in
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, LEDGER_SAVE_DELAY)
+
+    def count(self, endpoint: str | None = None) -> int:
+        """Return the number of requests within the window - for one endpoint or in total."""
+        self._prune(time.time())
+        if endpoint is not None:
+            return len(self._requests.get(endpoint.strip("/"), ()))
+        return sum(len(stamps) for stamps in self._requests.values())
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of requests within the window per endpoint."""
+        self._prune(time.time())
+        return {endpoint: len(stamps) for endpoint, stamps in self._requests.items()}
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Return the data to persist."""
+        self._save_pending = False
+        return {"requests": {endpoint: [round(t, 1) for t in stamps] for endpoint, stamps in self._requests.items()}}
+
+
+class GoveeAPIRateLimiter:
+    """Token bucket sized to the daily Govee API request quota."""
+
+    def __init__(
+        self,
+        entry_id: str,
+        daily_limit: int = API_DAILY_LIMIT,
+        burst_size: int = DEFAULT_BURST_SIZE,
+        spent: Callable[[], int] | None = None,
+        control_reserve: int = 0,
+    ) -> None:
+        """Initialize the rate limiter."""
+        self._entry_id = entry_id
+        self._daily_limit = daily_limit
+        self._reserve = daily_limit * control_reserve / 100
+        self._rate = daily_limit / 86400
+        self._capacity = max(1, int(burst_size))
+        self._tokens = float(self._capacity)
+        self._updated = time.monotonic()
+        self._spent = spent
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def tokens(self) -> float:
+        """Return the number of currently available tokens."""
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _daily_exhausted(self, priority: int = PRIORITY_STATE) -> bool:
+        """Return True if the requests spent today reached the daily limit - short of the control reserve for others."""
+        if self._spent is None:
+            return False
+        limit = self._daily_limit if priority == PRIORITY_CONTROL else self._daily_limit - self._reserve
+        return self._spent() >= limit
+
+    def try_acquire(self, priority: int = PRIORITY_STATE) -> bool:
+        """Take a token without waiting - return False if none is available."""
+        self._refill()
+        if self._tokens < 1 or self._daily_exhausted(priority):
+            return False
+        self._tokens -= 1
+        return True
+
+    async def async_acquire(
+        self, wait: bool = True, max_wait: float = DEFAULT_RATE_LIMIT_MAX_WAIT, priority: int = PRIORITY_STATE
+    ) -> bool:
+        """Async: Take a token - waiting up to max_wait seconds in priority order if wait is set, else drop right away"""
+        if not self._waiters and self.try_acquire(priority):
+            return True
+        if not wait or self._daily_exhausted(priority):
+            _LOGGER.debug("%s - GoveeAPIRateLimiter: no token available, request dropped", self._entry_id)
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+        try:
+            async with asyncio.timeout(max_wait):
+                return await future
+        except TimeoutError:
+            if future.done() and not future.cancelled():
+                return future.result()
+            _LOGGER.debug("%s - GoveeAPIRateLimiter: no token within %s seconds", self._entry_id, max_wait)
+            return False
+
+    @callback
+    def _dispatch(self) -> None:
+        """Hand out the available tokens to the waiting callers and schedule the next round."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+            elif self._daily_exhausted(priority):
+                heapq.heappop(self._waiters)
+                future.set_result(False)
+            elif self.try_acquire(priority):
+                heapq.heappop(self._waiters)
+                future.set_result(True)
+            else:
+                self._timer = asyncio.get_running_loop().call_later((1 - self._tokens) / self._rate, self._dispatch)
+                return
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of callers waiting for a token."""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+
+class GoveeAPIPollPlanner:
+    """Plan the per-device poll interval so the spend within the rolling quota window stays within a share of the quota."""
+
+    # Spend may deviate this many requests (or 10% of the projected spend) before a re-plan
+    DRIFT_TOLERANCE = 25
+
+    def __init__(
+        self,
+        entry_id: str,
+        daily_limit: int = API_DAILY_LIMIT,
+        quota_share: int = DEFAULT_QUOTA_SHARE,
+        control_reserve: int = 0,
+    ) -> None:
+        """Initialize the poll planner."""
+        self._entry_id = entry_id
+        # polling never plans into the share reserved for control commands
+        self._budget = daily_limit * min(quota_share, 100 - control_reserve) / 100
+        self._devices = 0
+        self._planned_at = time.monotonic()
+        self._planned_spent = 0
+        self._window = float(API_QUOTA_WINDOW)
+        self.interval: float | None = None
+
+    @property
+    def budget(self) -> float:
+        """Return the number of requests the planner may spend per day."""
+        return self._budget
+
+    def sustainable(self, spent: int) -> float:
+        """Return the requests the rolling window sustains over its length - less the spend beyond the budget."""
+        # requests age out of the window as fast as new ones come in, so the budget is a rate, not a stock
+        return max(0.0, self._budget - max(0, spent - self._budget))
+
+    def plan(self, devices: int, spent: int, window: float, min_interval: float = DEFAULT_POLL_INTERVAL) -> float:
+        """Compute the poll interval that spends the budget at the rate the rolling window sustains."""
+        sustainable = self.sustainable(spent)
+        if devices <= 0:
+            interval = min_interval
+        elif sustainable < devices:
+            # over-spent - poll every device once per window until requests age out
+            interval = max(min_interval, window)
+        else:
+            interval = max(min_interval, devices * window / sustainable)
+
+        if self.interval is None or abs(interval - self.interval) > self.interval * 0.1:
+            _LOGGER.info(
+                "%s - GoveeAPIPollPlanner: poll interval %.0f seconds for %s devices (%s of %.0f requests spent)",
+                self._entry_id,
+                interval,
+                devices,
+                spent,
+                self._budget,
+            )
+        self.interval = interval
+        self._devices = devices
+        self._window = window
+        self._planned_at = time.monotonic()
+        self._planned_spent = spent
+        return interval
+
+    def projected_spent(self) -> float:
+        """Return the number of requests the current plan expects to be within the window by now."""
+        if not self.interval:
+            return self._planned_spent
+        # new polls come in while the spend at planning time ages out of the window
+        rate = self._devices / self.interval - self._planned_spent / self._window
+        return max(0.0, self._planned_spent + (time.monotonic() - self._planned_at) * rate)
+
+    def has_spare(self, spent: int, window: float) -> bool:
+        """Return True if the budget covers the current plan with at least one spare poll per device."""
+        if not self.interval:
+            return False
+        needed = self._devices * window / self.interval
+        spare = min(self._budget - spent, self.sustainable(spent) - needed)
+        return spare >= max(1, self._devices)
+
+    def drifted(self, spent: int) -> bool:
+        """Return True if the real spend deviates from the projection of the current plan."""
+        if self.interval is None:
+            return True
+        projected = self.projected_spent()
+        tolerance = max(self.DRIFT_TOLERANCE, (projected - self._planned_spent) * 0.1)
+        return abs(spent - projected) > tolerance
@@ -0,0 +1,77 @@
+"""Replay of a diagnostics dump for the Govee Life integration."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Final
+
+from homeassistant.core import HomeAssistant
+
+from .const import STATE_DEBUG_FILENAME
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# Seconds between two checks of the replay file for changes
+REPLAY_RECHECK_INTERVAL: Final = 10
+
+
+class GoveeAPIReplayBackend:
+    """Serve cloud devices and states from a diagnostics dump instead of the Govee API."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, path: str | None = None) -> None:
+        """Initialize the replay backend."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._path = path or os.path.dirname(os.path.realpath(__file__)) + STATE_DEBUG_FILENAME
+        self._lock = asyncio.Lock()
+        self._mtime: float | None = None
+        self._checked = 0.0
+        self._data: dict = {}
+        self.enabled = False
+
+    @property
+    def path(self) -> str:
+        """Return the path of the replay file."""
+        return self._path
+
+    async def async_setup(self) -> bool:
+        """Async: Check once whether a replay file is present - return True if replay is enabled"""
+        self.enabled = await self._hass.async_add_executor_job(os.path.isfile, self._path)
+        if self.enabled:
+            _LOGGER.warning(
+                "%s - GoveeAPIReplayBackend: replaying %s instead of the Govee API", self._entry_id, self._path
+            )
+        return self.enabled
+
+    def _load(self, mtime: float | None) -> tuple[float, dict | None]:
+        """Return the modification time and - if changed since mtime - the parsed replay file"""
+        current = os.path.getmtime(self._path)
+        if current == mtime:
+            return current, None
+        with open(self._path) as stream:
+            return current, json.load(stream)
+
+    async def async_data(self) -> dict:
+        """Async: Return the parsed replay file - re-read off the event loop only if it changed"""
+        async with self._lock:
+            if self._mtime is not None and time.monotonic() - self._checked < REPLAY_RECHECK_INTERVAL:
+                return self._data
+            mtime, data = await self._hass.async_add_executor_job(self._load, self._mtime)
+            self._checked = time.monotonic()
+            if data is not None:
+                _LOGGER.debug("%s - GoveeAPIReplayBackend: loaded replay file: %s", self._entry_id, self._path)
+                self._mtime = mtime
+                self._data = data
+            return self._data
+
+    async def async_devices(self) -> list:
+        """Async: Return the cloud devices of the replay file"""
+        return (await self.async_data())["data"]["cloud_devices"]
+
+    async def async_state(self, device: str) -> dict:
+        """Async: Return the cloud state of a device of the replay file"""
+        return (await self.async_data())["data"]["cloud_states"][device]
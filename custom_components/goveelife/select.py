@@ -13,6 +13,7 @@ from homeassistant.core import HomeAssistant
 
 from .const import CONF_COORDINATORS, DOMAIN
 from .entities import GoveeLifePlatformEntity
+from .state import capability_key
 from .utils import GoveeAPI_GetCachedStateValue, async_GoveeAPI_ControlDevice
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -91,6 +92,7 @@ class GoveeLifeSelect(SelectEntity, GoveeLifePlatformEntity):
     def _init_platform_specific(self, **kwargs) -> None:
         """Platform specific initialization."""
         self._cap = kwargs.get("cap", None)
+        self._capabilities = {capability_key(self._cap.get("type"), self._cap.get("instance"))}
         instance = self._cap.get("instance", "mode")
         # Make the display name human-friendly
         display_instance = instance.replace("hdmiSource", "HDMI Source")
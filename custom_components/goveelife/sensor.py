@@ -4,32 +4,38 @@ from __future__ import annotations
 
 import logging
 import re
+from datetime import datetime
 from typing import Final
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
+    SensorEntity,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONCENTRATION_PARTS_PER_MILLION,
     CONF_DEVICES,
+    CONF_FRIENDLY_NAME,
     PERCENTAGE,
     STATE_UNKNOWN,
     UnitOfTemperature,
 )
 from homeassistant.core import (
     HomeAssistant,
-    callback,
 )
-from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 
+from .api import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
 from .const import (
     CONF_COORDINATORS,
+    DEFAULT_NAME,
     DOMAIN,
 )
 from .entities import GoveeLifePlatformEntity
-from .utils import GoveeAPI_GetCachedStateValue
+from .state import capability_key
+from .utils import GoveeAPI_GetCachedStateValue, GoveeAPI_GetClient, GoveeAPI_GetRequestLedger
 
 _LOGGER: Final = logging.getLogger(__name__)
 platform = "sensor"
@@ -106,6 +112,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
             )
             return False
 
+    try:
+        _LOGGER.debug("%s - async_setup_entry %s: Setup API diagnostic sensors", entry.entry_id, platform)
+        entities.append(GoveeLifeAPIStatusSensor(hass, entry))
+        entities.append(GoveeLifeAPIRequestsSensor(hass, entry))
+        entities.append(GoveeLifeAPIQuotaRemainingSensor(hass, entry))
+        entities.append(GoveeLifeAPIQuotaResetSensor(hass, entry))
+    except Exception as e:
+        _LOGGER.error(
+            "%s - async_setup_entry %s: Setup API diagnostic sensors failed: %s (%s.%s)",
+            entry.entry_id,
+            platform,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+
     _LOGGER.info("%s - async_setup_entry: setup %s %s entities", entry.entry_id, len(entities), platform)
     if not entities:
         return None
@@ -119,6 +141,7 @@ class GoveeLifeSensor(GoveeLifePlatformEntity):
         """Platform specific init actions"""
         capabilities = kwargs.get("cap")
         self._capability_name = capabilities.get("instance")
+        self._capabilities = {capability_key("devices.capabilities.property", self._capability_name)}
         self.uniqueid = self._identifier + "_" + self._entity_id + "_" + self._capability_name
         self._name = self._capability_name
         self._state_class = SensorStateClass.MEASUREMENT
@@ -159,11 +182,6 @@ class GoveeLifeSensor(GoveeLifePlatformEntity):
         if self.state_class is not None:
             return {"state_class": self.state_class}
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self.async_write_ha_state()
-
     @property
     def state(self) -> str | None:
         """Return the current state of the entity."""
@@ -176,3 +194,114 @@ class GoveeLifeSensor(GoveeLifePlatformEntity):
         )
         _LOGGER.debug("%s - %s: state value: %s", self._api_id, self._identifier, value)
         return value
+
+
+class GoveeLifeAPIDiagnosticSensor(SensorEntity):
+    """Base class for diagnostic sensors describing the Govee API account of a config entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, key: str) -> None:
+        """Initialize the sensor."""
+        self.hass = hass
+        self._entry_id = entry.entry_id
+        self._api_id = str(entry.data.get(CONF_FRIENDLY_NAME, DEFAULT_NAME))
+        self._attr_unique_id = entry.entry_id + "_" + key
+        self._attr_name = self._api_id + " " + key.replace("_", " ")
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=self._api_id,
+            manufacturer="Govee",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+
+class GoveeLifeAPIStatusSensor(GoveeLifeAPIDiagnosticSensor):
+    """State of the circuit breaker guarding the Govee cloud API."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN]
+    _attr_icon = "mdi:cloud-check-outline"
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(hass, entry, "api_status")
+        self._breaker = GoveeAPI_GetClient(hass, entry.entry_id).circuit_breaker
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the state changes of the circuit breaker."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._breaker.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def native_value(self) -> str:
+        """Return the state of the circuit breaker."""
+        return self._breaker.state
+
+
+class GoveeLifeAPIRequestsSensor(GoveeLifeAPIDiagnosticSensor):
+    """Requests counted locally within the rolling quota window."""
+
+    _attr_should_poll = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:counter"
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(hass, entry, "api_requests")
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of requests within the window."""
+        return GoveeAPI_GetRequestLedger(self.hass, self._entry_id).count()
+
+
+class GoveeLifeAPIRateLimitSensor(GoveeLifeAPIDiagnosticSensor):
+    """Base class for sensors showing the rate-limit headers of the Govee API."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, key: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(hass, entry, key)
+        self._rate_limit = GoveeAPI_GetClient(hass, entry.entry_id).rate_limit
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the rate-limit headers of the responses."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._rate_limit.async_add_listener(self.async_write_ha_state))
+
+
+class GoveeLifeAPIQuotaRemainingSensor(GoveeLifeAPIRateLimitSensor):
+    """Remaining requests reported by the Govee API."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_icon = "mdi:gauge"
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(hass, entry, "api_quota_remaining")
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the remaining requests."""
+        return self._rate_limit.remaining
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the limit the remaining requests refer to."""
+        return {"limit": self._rate_limit.limit}
+
+
+class GoveeLifeAPIQuotaResetSensor(GoveeLifeAPIRateLimitSensor):
+    """Time the Govee API resets the request quota."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(hass, entry, "api_quota_reset")
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return the reset time."""
+        return self._rate_limit.reset
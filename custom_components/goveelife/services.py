@@ -15,6 +15,7 @@ from .const import (
     CONF_ENTRY_ID,
     DOMAIN,
 )
+from .utils import GoveeAPI_PlanPollIntervals
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -49,8 +50,9 @@ async def async_service_SetPollInterval(hass: HomeAssistant, call: ServiceCall)
             return None
 
         hass.data[DOMAIN][entry_id][CONF_SCAN_INTERVAL] = scan_interval
+        GoveeAPI_PlanPollIntervals(hass, entry_id, "poll interval service called")
         _LOGGER.info(
-            "%s - async_service_SetPollInterval: Poll interval updated to %s seconds - change active after next poll",
+            "%s - async_service_SetPollInterval: Minimum poll interval updated to %s seconds - change active after next poll",
             DOMAIN,
             scan_interval,
         )
@@ -0,0 +1,230 @@
+"""Device state cache for the Govee Life integration."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import sys
+from collections.abc import Callable
+from typing import Any, Final
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import GoveeDeviceState
+from .const import DOMAIN
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+SNAPSHOT_STORAGE_VERSION: Final = 1
+SNAPSHOT_SAVE_DELAY: Final = 30
+
+CapabilityKey = tuple[str, str]
+
+# (type, instance) keys shared by the states of all devices
+_KEYS: dict[CapabilityKey, CapabilityKey] = {}
+
+ONLINE_KEY: CapabilityKey = ("devices.capabilities.online", "online")
+
+# monotonic revisions ordering the writes to the state cache
+_REVISIONS = itertools.count(1)
+
+
+def next_revision() -> int:
+    """Return a revision newer than all revisions returned before."""
+    return next(_REVISIONS)
+
+
+def capability_key(type_: str, instance: str) -> CapabilityKey:
+    """Return the shared (type, instance) key of a capability with both strings interned."""
+    key = (type_, instance)
+    shared = _KEYS.get(key)
+    if shared is None:
+        shared = _KEYS[key] = (sys.intern(type_), sys.intern(instance))
+    return shared
+
+
+class PendingState:
+    """Optimistic state of a capability awaiting its confirmation."""
+
+    __slots__ = ("cancel", "expected", "previous")
+
+    def __init__(self, expected: dict[str, Any], previous: dict | None) -> None:
+        """Initialize the pending state."""
+        self.expected = expected
+        self.previous = previous
+        # cancels the rollback scheduled for the pending state
+        self.cancel: Callable[[], None] | None = None
+
+    def matches(self, state: dict | None) -> bool:
+        """Return True if a state confirms the expected state."""
+        return state is not None and state.get("value") == self.expected.get("value")
+
+    def release(self) -> None:
+        """Cancel the scheduled rollback."""
+        if self.cancel is not None:
+            self.cancel()
+            self.cancel = None
+
+
+class DeviceState:
+    """State of a device with the capability states indexed by (type, instance).
+
+    Every capability carries the revision it was written at, so a response to a request issued before a
+    later write cannot overwrite that write. A stale state was restored from the snapshot of a previous run.
+    """
+
+    __slots__ = ("device", "pending", "revisions", "sku", "stale", "states")
+
+    def __init__(
+        self, sku: str | None, device: str | None, states: dict[CapabilityKey, dict | None], revision: int = 0
+    ) -> None:
+        """Initialize the device state."""
+        self.sku = sku
+        self.device = device
+        self.states = states
+        self.revisions = dict.fromkeys(states, revision)
+        self.pending: dict[CapabilityKey, PendingState] = {}
+        self.stale = False
+
+    @classmethod
+    def from_api(cls, payload: GoveeDeviceState, revision: int = 0) -> DeviceState:
+        """Return the state of a device/state response payload to a request issued at revision."""
+        return cls(
+            payload.get("sku"),
+            payload.get("device"),
+            {capability_key(c["type"], c["instance"]): c.get("state") for c in payload.get("capabilities", [])},
+            revision,
+        )
+
+    def value(self, type_: str, instance: str) -> Any:
+        """Return the state value of a capability - None if unknown."""
+        state = self.states.get((type_, instance))
+        if state is None:
+            return None
+        return state.get("value", state.get(instance))
+
+    @property
+    def online(self) -> bool:
+        """Return the state of the online capability - False if unknown."""
+        state = self.states.get(ONLINE_KEY)
+        if state is None:
+            return False
+        return state.get("value", False)
+
+    def changed(self, previous: DeviceState) -> set[CapabilityKey]:
+        """Return the keys of the capabilities whose state differs from a previous state of the device."""
+        changed = {key for key, state in self.states.items() if previous.states.get(key) != state}
+        changed.update(key for key in previous.states if key not in self.states)
+        return changed
+
+    def update(self, type_: str, instance: str, state: dict[str, Any]) -> bool:
+        """Replace the state of a known capability in place - return False if the capability is unknown."""
+        key = (type_, instance)
+        if key not in self.states:
+            return False
+        self.states[key] = state
+        self.revisions[key] = next_revision()
+        return True
+
+    def apply(self, type_: str, instance: str, state: dict[str, Any]) -> PendingState | None:
+        """Write an expected state ahead of its confirmation - return None if the capability is unknown."""
+        key = (type_, instance)
+        if key not in self.states:
+            return None
+        pending = self.pending.get(key)
+        if pending is not None:
+            # a rollback restores the state before the first unconfirmed write
+            pending.release()
+            previous = pending.previous
+        else:
+            previous = self.states[key]
+        pending = self.pending[key] = PendingState(state, previous)
+        self.states[key] = state
+        self.revisions[key] = next_revision()
+        return pending
+
+    def confirm(self, type_: str, instance: str) -> PendingState | None:
+        """Accept the pending state of a capability - return None if none is pending."""
+        pending = self.pending.pop((type_, instance), None)
+        if pending is not None:
+            pending.release()
+        return pending
+
+    def rollback(self, type_: str, instance: str) -> PendingState | None:
+        """Restore the state of a capability before its pending state - return None if none is pending."""
+        key = (type_, instance)
+        pending = self.confirm(type_, instance)
+        if pending is not None:
+            self.states[key] = pending.previous
+            self.revisions[key] = next_revision()
+        return pending
+
+    def keep_newer(self, previous: DeviceState) -> set[CapabilityKey]:
+        """Keep the capability states of a previous state written after this state was requested - return their keys."""
+        kept = set()
+        for key, revision in previous.revisions.items():
+            if revision > self.revisions.get(key, 0):
+                self.states[key] = previous.states[key]
+                self.revisions[key] = revision
+                if key in previous.pending:
+                    self.pending[key] = previous.pending[key]
+                kept.add(key)
+        return kept
+
+    def settled(self, previous: DeviceState) -> dict[CapabilityKey, PendingState]:
+        """Return the pending states of a previous state this state was requested after - they are resolved by it."""
+        return {key: pending for key, pending in previous.pending.items() if key not in self.pending}
+
+    def as_api_json(self, confirmed: bool = False) -> GoveeDeviceState:
+        """Return the state in the shape of the device/state response payload - optionally without pending states."""
+        capabilities = []
+        for key, state in self.states.items():
+            if confirmed and key in self.pending:
+                state = self.pending[key].previous
+            capabilities.append({"type": key[0], "instance": key[1], "state": state})
+        return {"sku": self.sku, "device": self.device, "capabilities": capabilities}
+
+
+class GoveeAPIStateSnapshot:
+    """Persistent snapshot of the last known device states, restored as stale states on startup."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, states: dict[str, DeviceState]) -> None:
+        """Initialize the snapshot of the cached states."""
+        self._entry_id = entry_id
+        self._states = states
+        self._store = Store(hass, SNAPSHOT_STORAGE_VERSION, GoveeAPIStateSnapshot.storage_key(entry_id))
+        self._save_pending = False
+
+    @staticmethod
+    def storage_key(entry_id: str) -> str:
+        """Return the storage key of the state snapshot of a config entry."""
+        return f"{DOMAIN}.{entry_id}.states"
+
+    async def async_load(self) -> None:
+        """Async: Restore the persisted states of the devices not yet in the cache as stale states."""
+        data = await self._store.async_load() or {}
+        for device, payload in data.get("states", {}).items():
+            if device in self._states:
+                continue
+            state = DeviceState.from_api(payload)
+            state.stale = True
+            self._states[device] = state
+        _LOGGER.debug("%s - GoveeAPIStateSnapshot: restored %s device states", self._entry_id, len(self._states))
+
+    def schedule(self) -> None:
+        """Schedule a write within SNAPSHOT_SAVE_DELAY - pending writes are also done when Home Assistant stops."""
+        # a scheduled write picks up the latest states - rescheduling it would postpone the write on every poll
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    async def async_flush(self) -> None:
+        """Async: Write the states right away."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Return the data to persist - the states confirmed by the devices."""
+        self._save_pending = False
+        return {"states": {device: state.as_api_json(confirmed=True) for device, state in self._states.items()}}
@@ -13,6 +13,7 @@ from homeassistant.core import HomeAssistant
 
 from .const import CONF_COORDINATORS, DOMAIN
 from .entities import GoveeLifePlatformEntity
+from .state import capability_key
 from .utils import GoveeAPI_GetCachedStateValue, async_GoveeAPI_ControlDevice
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -100,6 +101,7 @@ class GoveeLifeSwitch(SwitchEntity, GoveeLifePlatformEntity):
     def _init_platform_specific(self, **kwargs):
         """Platform specific initialization."""
         self._cap = kwargs.get("cap", None)
+        self._capabilities = {capability_key(self._cap.get("type"), self._cap.get("instance"))}
         self._name = f"{self._name} {str(self._cap['instance']).capitalize()}"
         self._entity_id = f"{self._entity_id}_{self._cap['instance']}"
         self.uniqueid = f"{self._identifier}_{self._entity_id}"
@@ -2,193 +2,155 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-import os
-import re
-import uuid
-from datetime import date
+from datetime import timedelta
 from typing import Final
 
-import aiohttp
 from homeassistant.const import (
-    ATTR_DATE,
-    CONF_API_KEY,
-    CONF_COUNT,
     CONF_PARAMS,
+    CONF_SCAN_INTERVAL,
     CONF_STATE,
-    CONF_TIMEOUT,
 )
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_call_later
 
+from .api import GoveeApiClient
 from .const import (
-    CLOUD_API_HEADER_KEY,
-    CLOUD_API_URL_OPENAPI,
-    CONF_API_COUNT,
+    CONF_API_CLIENT,
+    CONF_COORDINATORS,
+    CONF_OPTIMISTIC_WINDOW,
+    CONF_STARTUP_CONCURRENCY,
+    CONF_STATE_LOCKS,
+    CONF_STATE_SNAPSHOT,
+    DEFAULT_OPTIMISTIC_WINDOW,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_STARTUP_CONCURRENCY,
     DOMAIN,
-    STATE_DEBUG_FILENAME,
+    EVENT_OPTIMISTIC_ROLLBACK,
+    STARTUP_REFRESH_STAGGER,
 )
+from .quota import GoveeAPIPollPlanner, GoveeAPIRateLimiter, GoveeAPIRequestLedger
+from .replay import GoveeAPIReplayBackend
+from .state import DeviceState, GoveeAPIStateSnapshot, PendingState, capability_key, next_revision
 
 _LOGGER: Final = logging.getLogger(__name__)
 
 
-async def async_GoveeAPI_CountRequests(hass: HomeAssistant, entry_id: str) -> None:
-    """Async: Count daily number of requests to GoveeAPI"""
-    try:
-        entry_data = hass.data[DOMAIN][entry_id]
-        today = date.today()
-        v = entry_data.get(CONF_API_COUNT, {CONF_COUNT: 0, ATTR_DATE: today})
-        if v[ATTR_DATE] == today:
-            v[CONF_COUNT] = int(v[CONF_COUNT]) + 1
-        else:
-            v[CONF_COUNT] = 1
-        entry_data[CONF_API_COUNT] = v
+def GoveeAPI_GetClient(hass: HomeAssistant, entry_id: str) -> GoveeApiClient:
+    """Get the pooled API client of a config entry - create it if not yet present"""
+    entry_data = hass.data[DOMAIN][entry_id]
+    client = entry_data.get(CONF_API_CLIENT)
+    if client is None:
+        client = GoveeApiClient(hass, entry_id, entry_data[CONF_PARAMS])
+        entry_data[CONF_API_CLIENT] = client
+    return client
 
-        _LOGGER.debug("%s - async_GoveeAPI_CountRequests: %s -> %s", entry_id, v[ATTR_DATE], v[CONF_COUNT])
-    except Exception as e:
-        _LOGGER.error(
-            "%s - async_GoveeAPI_CountRequests: Failed: %s (%s.%s)",
-            entry_id,
-            str(e),
-            e.__class__.__module__,
-            type(e).__name__,
-        )
-        return None
 
+def GoveeAPI_GetReplayBackend(hass: HomeAssistant, entry_id: str) -> GoveeAPIReplayBackend:
+    """Get the diagnostics replay backend of a config entry"""
+    return GoveeAPI_GetClient(hass, entry_id).replay
+
+
+def GoveeAPI_GetStateLock(hass: HomeAssistant, entry_id: str, device: str) -> asyncio.Lock:
+    """Get the lock serializing the writes to the cached state of a device - create it if not yet present"""
+    locks = hass.data[DOMAIN][entry_id].setdefault(CONF_STATE_LOCKS, {})
+    lock = locks.get(device)
+    if lock is None:
+        lock = locks[device] = asyncio.Lock()
+    return lock
+
+
+def GoveeAPI_GetRateLimiter(hass: HomeAssistant, entry_id: str) -> GoveeAPIRateLimiter:
+    """Get the request quota rate limiter of a config entry"""
+    return GoveeAPI_GetClient(hass, entry_id).rate_limiter
+
+
+def GoveeAPI_GetRequestLedger(hass: HomeAssistant, entry_id: str) -> GoveeAPIRequestLedger:
+    """Get the persistent request ledger of a config entry"""
+    return GoveeAPI_GetClient(hass, entry_id).ledger
+
+
+def GoveeAPI_GetStateSnapshot(hass: HomeAssistant, entry_id: str) -> GoveeAPIStateSnapshot:
+    """Get the persistent snapshot of the cached device states of a config entry - create it if not yet present"""
+    entry_data = hass.data[DOMAIN][entry_id]
+    snapshot = entry_data.get(CONF_STATE_SNAPSHOT)
+    if snapshot is None:
+        snapshot = GoveeAPIStateSnapshot(hass, entry_id, entry_data.setdefault(CONF_STATE, {}))
+        entry_data[CONF_STATE_SNAPSHOT] = snapshot
+    return snapshot
 
-async def async_GoveeAPI_GETRequest(hass: HomeAssistant, entry_id: str, path: str) -> None:
-    """Async: Request device list via GoveeAPI"""
-    try:
-        debug_file = os.path.dirname(os.path.realpath(__file__)) + STATE_DEBUG_FILENAME
-        if os.path.isfile(debug_file):
-            _LOGGER.debug("%s - async_GoveeAPI_GETRequest: load debug file: %s", entry_id, debug_file)
-            with open(debug_file) as stream:
-                payload = json.load(stream)
-                return payload["data"]["cloud_devices"]
-    except Exception as e:
-        _LOGGER.error(
-            "%s - async_GoveeAPI_GETRequest: debug file load failed: %s (%s.%s)",
-            entry_id,
-            str(e),
-            e.__class__.__module__,
-            type(e).__name__,
-        )
-        return None
 
+def GoveeAPI_GetRequestCount(hass: HomeAssistant, entry_id: str) -> int:
+    """Get the number of requests to GoveeAPI within the quota window - the server's view wins if it is higher"""
+    return GoveeAPI_GetClient(hass, entry_id).request_count()
+
+
+def GoveeAPI_GetPollPlanner(hass: HomeAssistant, entry_id: str) -> GoveeAPIPollPlanner:
+    """Get the poll interval planner of a config entry"""
+    return GoveeAPI_GetClient(hass, entry_id).planner
+
+
+def GoveeAPI_HedgeAllowed(hass: HomeAssistant, entry_id: str) -> bool:
+    """Return True if the poll plan leaves spare request budget for a hedged request"""
+    return GoveeAPI_GetClient(hass, entry_id).hedge_allowed()
+
+
+def GoveeAPI_PlanPollIntervals(hass: HomeAssistant, entry_id: str, reason: str) -> None:
+    """Plan the poll interval for the current request spend and apply it to all device coordinators"""
     try:
-        _LOGGER.debug("%s - async_GoveeAPI_GETRequest: perform api request", entry_id)
         entry_data = hass.data[DOMAIN][entry_id]
+        coordinators = entry_data.get(CONF_COORDINATORS, {})
+        min_interval = entry_data.get(CONF_SCAN_INTERVAL) or entry_data[CONF_PARAMS].get(
+            CONF_SCAN_INTERVAL, DEFAULT_POLL_INTERVAL
+        )
+        interval = GoveeAPI_GetPollPlanner(hass, entry_id).plan(
+            len(coordinators),
+            GoveeAPI_GetRequestCount(hass, entry_id),
+            GoveeAPI_GetRequestLedger(hass, entry_id).window,
+            min_interval,
+        )
+        _LOGGER.debug("%s - GoveeAPI_PlanPollIntervals: %s -> %.0f seconds", entry_id, reason, interval)
 
-        headers = {
-            "Content-Type": "application/json",
-            CLOUD_API_HEADER_KEY: str(entry_data[CONF_PARAMS].get(CONF_API_KEY, None)),
-        }
-        timeout = entry_data[CONF_PARAMS].get(CONF_TIMEOUT, None)
-        url = CLOUD_API_URL_OPENAPI + "/" + path.strip("/")
-
-        await async_GoveeAPI_CountRequests(hass, entry_id)
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
-                if r.status == 429:
-                    _LOGGER.error(
-                        "%s - async_GoveeAPI_GETRequest: Too many API requests - limit is 10000/Account/Day", entry_id
-                    )
-                    return None
-                elif r.status == 401:
-                    _LOGGER.error("%s - async_GoveeAPI_GETRequest: Unauthorized - check your APIKey", entry_id)
-                    return None
-                elif r.status != 200:
-                    text = await r.text()
-                    _LOGGER.error("%s - async_GoveeAPI_GETRequest: Failed: %s", entry_id, text)
-                    return None
-
-                _LOGGER.debug("%s - async_GoveeAPI_GETRequest: convert resulting json to object", entry_id)
-                return (await r.json())["data"]
-
-    except (TimeoutError, aiohttp.ClientConnectionError, aiohttp.ServerDisconnectedError):
-        _LOGGER.warning("%s - async_GoveeAPI_GETRequest: Govee API unreachable, will retry on next poll", entry_id)
-        return None
+        update_interval = timedelta(seconds=interval)
+        for coordinator in coordinators.values():
+            if coordinator.update_interval != update_interval:
+                coordinator.update_interval = update_interval
     except Exception as e:
         _LOGGER.error(
-            "%s - async_GoveeAPI_GETRequest: Failed: %s (%s.%s)",
+            "%s - GoveeAPI_PlanPollIntervals: Failed: %s (%s.%s)",
             entry_id,
             str(e),
             e.__class__.__module__,
             type(e).__name__,
         )
-        return None
+
+
+def GoveeAPI_CheckPollPlan(hass: HomeAssistant, entry_id: str) -> None:
+    """Re-plan the poll intervals if the request spend drifted from the projection"""
+    if GoveeAPI_GetPollPlanner(hass, entry_id).drifted(GoveeAPI_GetRequestCount(hass, entry_id)):
+        GoveeAPI_PlanPollIntervals(hass, entry_id, "request spend drifted from projection")
+
+
+async def async_GoveeAPI_GETRequest(hass: HomeAssistant, entry_id: str, path: str, wait=True) -> None:
+    """Async: Request device list via GoveeAPI"""
+    return await GoveeAPI_GetClient(hass, entry_id).async_get(path, wait)
 
 
 async def async_GoveeAPI_POSTRequest(
-    hass: HomeAssistant, entry_id: str, path: str, data: str, return_status_code=False
+    hass: HomeAssistant, entry_id: str, path: str, data: dict, return_status_code=False, wait=True
 ) -> None:
     """Async: Perform post state request / control request via GoveeAPI"""
-    try:
-        entry_data = hass.data[DOMAIN][entry_id]
-
-        headers = {
-            "Content-Type": "application/json",
-            CLOUD_API_HEADER_KEY: str(entry_data[CONF_PARAMS].get(CONF_API_KEY, None)),
-        }
-        timeout = entry_data[CONF_PARAMS].get(CONF_TIMEOUT, None)
-        data = re.sub("<dynamic_uuid>", str(uuid.uuid4()), data)
-        _LOGGER.debug("%s - async_GoveeAPI_POSTRequest: data = %s", entry_id, data)
-        data = json.loads(data)
-        url = CLOUD_API_URL_OPENAPI + "/" + path.strip("/")
-
-        await async_GoveeAPI_CountRequests(hass, entry_id)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=data, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as r:
-                if r.status == 429:
-                    _LOGGER.error(
-                        "%s - async_GoveeAPI_POSTRequest: Too many API requests - limit is 10000/Account/Day", entry_id
-                    )
-                    if return_status_code:
-                        return r.status
-                    return None
-                elif r.status == 401:
-                    _LOGGER.error("%s - async_GoveeAPI_POSTRequest: Unauthorized - check your APIKey", entry_id)
-                    if return_status_code:
-                        return r.status
-                    return None
-                elif r.status != 200:
-                    text = await r.text()
-                    _LOGGER.error("%s - async_GoveeAPI_POSTRequest: Failed status_code: %s", entry_id, text)
-                    if return_status_code:
-                        return r.status
-                    return None
-
-                return await r.json()
-
-    except (TimeoutError, aiohttp.ClientConnectionError, aiohttp.ServerDisconnectedError):
-        _LOGGER.warning("%s - async_GoveeAPI_POSTRequest: Govee API unreachable, will retry on next poll", entry_id)
-        return None
-    except Exception as e:
-        _LOGGER.error(
-            "%s - async_GoveeAPI_POSTRequest: Failed: %s (%s.%s)",
-            entry_id,
-            str(e),
-            e.__class__.__module__,
-            type(e).__name__,
-        )
-        return None
+    return await GoveeAPI_GetClient(hass, entry_id).async_post(path, data, return_status_code, wait)
 
 
 async def async_GoveeAPI_GetDeviceState(
-    hass: HomeAssistant, entry_id: str, device_cfg, return_status_code=False
+    hass: HomeAssistant, entry_id: str, device_cfg, return_status_code=False, wait=True
 ) -> None:
     """Async: Request and save state of device via GoveeAPI"""
     try:
         entry_data = hass.data[DOMAIN][entry_id]
-        json_str = json.dumps(
-            {
-                "requestId": "<dynamic_uuid>",
-                "payload": {
-                    "sku": str(device_cfg.get("sku")),
-                    "device": str(device_cfg.get("device")),
-                },
-            }
-        )
+        client = GoveeAPI_GetClient(hass, entry_id)
         r = None
     except Exception as e:
         _LOGGER.error(
@@ -201,12 +163,11 @@ async def async_GoveeAPI_GetDeviceState(
         return False
 
     try:
-        debug_file = os.path.dirname(os.path.realpath(__file__)) + STATE_DEBUG_FILENAME
-        if os.path.isfile(debug_file):
-            _LOGGER.debug("%s - async_GoveeAPI_GetDeviceState: load debug file: %s", entry_id, debug_file)
-            with open(debug_file) as stream:
-                payload = json.load(stream)
-                r = payload["data"]["cloud_states"][device_cfg.get("device")]
+        replay = GoveeAPI_GetReplayBackend(hass, entry_id)
+        if replay.enabled:
+            _LOGGER.debug("%s - async_GoveeAPI_GetDeviceState: load debug file: %s", entry_id, replay.path)
+            issued = next_revision()
+            r = await replay.async_state(device_cfg.get("device"))
     except Exception as e:
         _LOGGER.error(
             "%s - async_GoveeAPI_GetDeviceState: debug file load failed: %s (%s.%s)",
@@ -219,16 +180,34 @@ async def async_GoveeAPI_GetDeviceState(
 
     try:
         if r is None:
-            r = await async_GoveeAPI_POSTRequest(hass, entry_id, "device/state", json_str, return_status_code)
-            r = r["payload"]
-        if isinstance(r, int) and return_status_code:
-            return r
-        if not isinstance(r, int):
-            entry_data.setdefault(CONF_STATE, {})
-            d = device_cfg.get("device")
-            entry_data[CONF_STATE][d] = r
-            return True
-        return False
+
+            async def _async_get_state():
+                # the revision is taken when the request is sent - joining callers share it
+                issued = next_revision()
+                return issued, await client.async_get_state(device_cfg.get("sku"), device_cfg.get("device"), wait)
+
+            issued, r = await client.single_flight("device/state:" + str(device_cfg.get("device")), _async_get_state)
+            if r is None:
+                return False
+        entry_data.setdefault(CONF_STATE, {})
+        d = device_cfg.get("device")
+        state = DeviceState.from_api(r, issued)
+        async with GoveeAPI_GetStateLock(hass, entry_id, d):
+            previous = entry_data[CONF_STATE].get(d)
+            if previous is not None:
+                kept = state.keep_newer(previous)
+                if kept:
+                    _LOGGER.debug(
+                        "%s - async_GoveeAPI_GetDeviceState: kept states written after the request: %s", entry_id, kept
+                    )
+            entry_data[CONF_STATE][d] = state
+            if previous is not None:
+                for (type_, instance), pending in state.settled(previous).items():
+                    pending.release()
+                    if not pending.matches(state.states.get((type_, instance))):
+                        GoveeAPI_ReportRollback(hass, entry_id, d, type_, instance, pending, "contradicted")
+        GoveeAPI_GetStateSnapshot(hass, entry_id).schedule()
+        return True
 
     except Exception as e:
         _LOGGER.error(
@@ -241,24 +220,103 @@ async def async_GoveeAPI_GetDeviceState(
         return False
 
 
+async def async_GoveeAPI_RefreshCoordinators(hass: HomeAssistant, entry_id: str, coordinators: list) -> None:
+    """Async: Do the first refresh of device coordinators - staggered and bounded by the startup concurrency"""
+    concurrency = hass.data[DOMAIN][entry_id][CONF_PARAMS].get(CONF_STARTUP_CONCURRENCY, DEFAULT_STARTUP_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _async_refresh(index: int, coordinator) -> None:
+        await asyncio.sleep(index * STARTUP_REFRESH_STAGGER)
+        async with semaphore:
+            await coordinator.async_first_refresh()
+
+    _LOGGER.debug(
+        "%s - async_GoveeAPI_RefreshCoordinators: refreshing %s devices, %s at a time",
+        entry_id,
+        len(coordinators),
+        concurrency,
+    )
+    await asyncio.gather(*(_async_refresh(index, coordinator) for index, coordinator in enumerate(coordinators)))
+
+
+def GoveeAPI_NotifyStateChanged(hass: HomeAssistant, entry_id: str, device: str, keys: set) -> None:
+    """Let the entities of a device depending on the given capabilities write their state"""
+    coordinator = hass.data[DOMAIN][entry_id].get(CONF_COORDINATORS, {}).get(device)
+    if coordinator is None:
+        return
+    coordinator.changed = keys
+    coordinator.async_update_listeners()
+
+
+def GoveeAPI_ReportRollback(
+    hass: HomeAssistant, entry_id: str, device: str, type_: str, instance: str, pending: PendingState, reason: str
+) -> None:
+    """Log and fire an event for an optimistic state the device did not confirm"""
+    _LOGGER.warning(
+        "%s - GoveeAPI_ReportRollback: %s %s of %s not confirmed (%s) - rolled back",
+        entry_id,
+        type_,
+        instance,
+        device,
+        reason,
+    )
+    hass.bus.async_fire(
+        EVENT_OPTIMISTIC_ROLLBACK,
+        {
+            "entry_id": entry_id,
+            "device": device,
+            "type": type_,
+            "instance": instance,
+            "expected": pending.expected.get("value"),
+            "reason": reason,
+        },
+    )
+
+
+async def async_GoveeAPI_ApplyOptimisticState(hass: HomeAssistant, entry_id: str, device: str, capability) -> bool:
+    """Async: Show the expected result of a command at once - roll it back if not confirmed in time"""
+    entry_data = hass.data[DOMAIN][entry_id]
+    window = entry_data[CONF_PARAMS].get(CONF_OPTIMISTIC_WINDOW, DEFAULT_OPTIMISTIC_WINDOW)
+    state = entry_data.get(CONF_STATE, {}).get(device)
+    if not window or state is None or "value" not in capability:
+        return False
+    type_, instance = capability["type"], capability["instance"]
+    async with GoveeAPI_GetStateLock(hass, entry_id, device):
+        pending = state.apply(type_, instance, {"value": capability["value"]})
+    if pending is None:
+        return False
+
+    async def _async_timeout(_now) -> None:
+        pending.cancel = None
+        await async_GoveeAPI_RollbackOptimisticState(hass, entry_id, device, type_, instance, "timeout")
+
+    pending.cancel = async_call_later(hass, window, _async_timeout)
+    GoveeAPI_NotifyStateChanged(hass, entry_id, device, {capability_key(type_, instance)})
+    return True
+
+
+async def async_GoveeAPI_RollbackOptimisticState(
+    hass: HomeAssistant, entry_id: str, device: str, type_: str, instance: str, reason: str
+) -> None:
+    """Async: Restore the state of a capability before its unconfirmed optimistic state"""
+    if entry_id not in hass.data.get(DOMAIN, {}):
+        return
+    async with GoveeAPI_GetStateLock(hass, entry_id, device):
+        state = hass.data[DOMAIN][entry_id].get(CONF_STATE, {}).get(device)
+        pending = None if state is None else state.rollback(type_, instance)
+    if pending is None:
+        return
+    GoveeAPI_ReportRollback(hass, entry_id, device, type_, instance, pending, reason)
+    GoveeAPI_NotifyStateChanged(hass, entry_id, device, {capability_key(type_, instance)})
+
+
 async def async_GoveeAPI_ControlDevice(
     hass: HomeAssistant, entry_id: str, device_cfg, state_capability, return_status_code=False
 ) -> None:
     """Async: Trigger device action via GoveeAPI"""
     try:
         entry_data = hass.data[DOMAIN][entry_id]
-        state_capability_json = json.dumps(state_capability)
-        json_str = json.dumps(
-            {
-                "requestId": "<dynamic_uuid>",
-                "payload": {
-                    "sku": str(device_cfg.get("sku")),
-                    "device": str(device_cfg.get("device")),
-                    "capability": state_capability,
-                },
-            }
-        )
-        _LOGGER.debug("%s - async_GoveeAPI_ControlDevice: json_str = %s", entry_id, json_str)
+        _LOGGER.debug("%s - async_GoveeAPI_ControlDevice: capability = %s", entry_id, state_capability)
         r = None
     except Exception as e:
         _LOGGER.error(
@@ -271,16 +329,14 @@ async def async_GoveeAPI_ControlDevice(
         return False
 
     try:
-        debug_file = os.path.dirname(os.path.realpath(__file__)) + STATE_DEBUG_FILENAME
-        if os.path.isfile(debug_file):
+        if GoveeAPI_GetReplayBackend(hass, entry_id).enabled:
             _LOGGER.debug("%s - async_GoveeAPI_ControlDevice: create debug reply", entry_id)
-            state_capability["state"] = {"status": "success"}
-            state_capability_json = json.dumps(state_capability)
-            r = json.loads(
-                '{"requestId": "debug-dummy", "msg": "success", "code": 200, "capability": '
-                + state_capability_json
-                + "}"
-            )
+            r = {
+                "requestId": "debug-dummy",
+                "msg": "success",
+                "code": 200,
+                "capability": {**state_capability, "state": {"status": "success"}},
+            }
     except Exception as e:
         _LOGGER.error(
             "%s - async_GoveeAPI_ControlDevice: debug reply failed: %s (%s.%s)",
@@ -291,10 +347,30 @@ async def async_GoveeAPI_ControlDevice(
         )
         return False
 
+    try:
+        d = device_cfg.get("device")
+        optimistic = await async_GoveeAPI_ApplyOptimisticState(hass, entry_id, d, state_capability)
+    except Exception as e:
+        _LOGGER.warning(
+            "%s - async_GoveeAPI_ControlDevice: optimistic state failed: %s (%s.%s)",
+            entry_id,
+            str(e),
+            e.__class__.__module__,
+            type(e).__name__,
+        )
+        optimistic = False
+
     try:
         if r is None:
-            r = await async_GoveeAPI_POSTRequest(hass, entry_id, "device/control", json_str, return_status_code)
+            r = await GoveeAPI_GetClient(hass, entry_id).async_control(
+                device_cfg.get("sku"), device_cfg.get("device"), state_capability, return_status_code
+            )
+            GoveeAPI_PlanPollIntervals(hass, entry_id, "control command sent")
         _LOGGER.debug("%s - async_GoveeAPI_ControlDevice: r = %s", entry_id, r)
+        if optimistic and (r is None or isinstance(r, int)):
+            await async_GoveeAPI_RollbackOptimisticState(
+                hass, entry_id, d, state_capability["type"], state_capability["instance"], "rejected"
+            )
         if isinstance(r, int) and return_status_code:
             return r
         if isinstance(r, int):
@@ -308,24 +384,24 @@ async def async_GoveeAPI_ControlDevice(
         if r.get("capability") is not None:
             try:
                 entry_data.setdefault(CONF_STATE, {})
-                d = device_cfg.get("device")
                 new_cap = r["capability"]
                 v = new_cap.pop("value")
+                # the command echo confirms an optimistic state only if the command succeeded
+                confirmed = (new_cap.get("state") or {}).get("status") == "success"
                 new_cap["state"] = {"value": v}
-                cache_updated = False
-                for cap in entry_data[CONF_STATE][d]["capabilities"]:
-                    if cap["type"] == new_cap["type"] and cap["instance"] == new_cap["instance"]:
-                        entry_data[CONF_STATE][d]["capabilities"].remove(cap)
-                        entry_data[CONF_STATE][d]["capabilities"].append(new_cap)
-                        _LOGGER.debug(
-                            "%s - async_GoveeAPI_ControlDevice: updated old capability state: %s", entry_id, cap
+                async with GoveeAPI_GetStateLock(hass, entry_id, d):
+                    if optimistic and not confirmed:
+                        updated = False
+                    else:
+                        updated = entry_data[CONF_STATE][d].update(
+                            new_cap["type"], new_cap["instance"], new_cap["state"]
                         )
-                        _LOGGER.debug(
-                            "%s - async_GoveeAPI_ControlDevice: with new capability state: %s", entry_id, new_cap
-                        )
-                        cache_updated = True
-                        break
-                if not cache_updated:
+                    if optimistic and confirmed:
+                        entry_data[CONF_STATE][d].confirm(new_cap["type"], new_cap["instance"])
+                GoveeAPI_GetStateSnapshot(hass, entry_id).schedule()
+                if updated:
+                    _LOGGER.debug("%s - async_GoveeAPI_ControlDevice: with new capability state: %s", entry_id, new_cap)
+                else:
                     _LOGGER.debug(
                         "%s - async_GoveeAPI_ControlDevice: no matching cap in cache for type=%s instance=%s — skipping cache update",
                         entry_id,
@@ -361,8 +437,7 @@ def GoveeAPI_GetCachedStateValue(hass: HomeAssistant, entry_id: str, device_id,
     """Get value of a state from local cache"""
     try:
         entry_data = hass.data[DOMAIN][entry_id]
-        capabilities = ((entry_data.get(CONF_STATE)).get(device_id)).get("capabilities", [])
-        value = None
+        state = entry_data.get(CONF_STATE, {}).get(device_id)
     except Exception as e:
         _LOGGER.error(
             "%s - GoveeAPI_GetCachedStateValue: Failed: %s (%s.%s)",
@@ -373,13 +448,12 @@ def GoveeAPI_GetCachedStateValue(hass: HomeAssistant, entry_id: str, device_id,
         )
         return None
 
+    if state is None:
+        # no state received yet - the entity is unavailable
+        return None
+
     try:
-        for cap in capabilities:
-            if cap["type"] == value_type and cap["instance"] == value_instance:
-                cap_state = cap.get("state", None)
-                if cap_state is not None:
-                    value = cap_state.get("value", cap_state.get(value_instance, None))
-        return value
+        return state.value(value_type, value_instance)
     except Exception as e:
         _LOGGER.error(
             "%s - GoveeAPI_GetCachedStateValue: Failed: %s (%s.%s)",
@@ -394,30 +468,12 @@ def GoveeAPI_GetCachedStateValue(hass: HomeAssistant, entry_id: str, device_id,
 async def async_GoveeAPI_GetDynamicScenes(hass: HomeAssistant, entry_id: str, device_cfg) -> list:
     """Async: Get dynamic scenes for a device via Govee API"""
     try:
-        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicScenes: preparing values", entry_id)
-        json_str = json.dumps(
-            {
-                "requestId": str(uuid.uuid4()),
-                "payload": {"sku": str(device_cfg.get("sku")), "device": str(device_cfg.get("device"))},
-            }
+        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicScenes: requesting dynamic scenes", entry_id)
+        options = await GoveeAPI_GetClient(hass, entry_id).async_get_scenes(
+            device_cfg.get("sku"), device_cfg.get("device")
         )
-
-        r = await async_GoveeAPI_POSTRequest(hass, entry_id, "device/scenes", json_str)
-
-        if r and r.get("code") == 200:
-            payload = r.get("payload", {})
-            capabilities = payload.get("capabilities", [])
-
-            for cap in capabilities:
-                if cap.get("type") == "devices.capabilities.dynamic_scene" and cap.get("instance") == "lightScene":
-                    options = cap.get("parameters", {}).get("options", [])
-                    _LOGGER.debug(
-                        "%s - async_GoveeAPI_GetDynamicScenes: found %d dynamic scenes", entry_id, len(options)
-                    )
-                    return options
-
-        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicScenes: no dynamic scenes found", entry_id)
-        return []
+        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicScenes: found %d dynamic scenes", entry_id, len(options))
+        return options
 
     except Exception as e:
         _LOGGER.error(
@@ -433,30 +489,12 @@ async def async_GoveeAPI_GetDynamicScenes(hass: HomeAssistant, entry_id: str, de
 async def async_GoveeAPI_GetDynamicDIYScenes(hass: HomeAssistant, entry_id: str, device_cfg) -> list:
     """Async: Get dynamic DIY scenes for a device via Govee API"""
     try:
-        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicDIYScenes: preparing values", entry_id)
-        json_str = json.dumps(
-            {
-                "requestId": str(uuid.uuid4()),
-                "payload": {"sku": str(device_cfg.get("sku")), "device": str(device_cfg.get("device"))},
-            }
+        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicDIYScenes: requesting DIY scenes", entry_id)
+        options = await GoveeAPI_GetClient(hass, entry_id).async_get_diy_scenes(
+            device_cfg.get("sku"), device_cfg.get("device")
         )
-
-        r = await async_GoveeAPI_POSTRequest(hass, entry_id, "device/diy-scenes", json_str)
-
-        if r and r.get("code") == 200:
-            payload = r.get("payload", {})
-            capabilities = payload.get("capabilities", [])
-
-            for cap in capabilities:
-                if cap.get("instance") == "diyScene":
-                    options = cap.get("parameters", {}).get("options", [])
-                    _LOGGER.debug(
-                        "%s - async_GoveeAPI_GetDynamicDIYScenes: found %d DIY scenes", entry_id, len(options)
-                    )
-                    return options
-
-        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicDIYScenes: no DIY scenes found", entry_id)
-        return []
+        _LOGGER.debug("%s - async_GoveeAPI_GetDynamicDIYScenes: found %d DIY scenes", entry_id, len(options))
+        return options
 
     except Exception as e:
         _LOGGER.error(
@@ -0,0 +1,177 @@
+"""Local Govee OpenAPI simulator serving the device response fixtures.
+
+Run standalone for load tests and point the integration's base URL option at it:
+
+    python -m tests.simulator --port 8080 --latency 0.2 --error-rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import random
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+DEVICE_RESPONSES_DIR = FIXTURES_DIR / "device_responses"
+API_PREFIX = "/router/api/v1"
+
+
+def _initial_value(capability: dict):
+    """Return a plausible state value for a capability from its parameters."""
+    parameters = capability.get("parameters", {})
+    if parameters.get("options"):
+        return parameters["options"][0].get("value")
+    if "range" in parameters:
+        return parameters["range"].get("min", 0)
+    if parameters.get("dataType") == "STRUCT":
+        return {}
+    return 0
+
+
+class GoveeAPISimulator:
+    """aiohttp application answering like the Govee OpenAPI, with injectable faults."""
+
+    def __init__(self, fixtures_dir: Path = DEVICE_RESPONSES_DIR, daily_quota: int | None = None) -> None:
+        """Initialize the simulator from a directory of device fixtures."""
+        self.devices: dict[str, dict] = {}
+        self.states: dict[str, dict] = {}
+        for fixture in sorted(fixtures_dir.glob("*.json")):
+            device = json.loads(fixture.read_text())
+            device.pop("github_issue_url", None)
+            self.devices[device["device"]] = device
+            self.states[device["device"]] = {
+                (c["type"], c["instance"]): _initial_value(c) for c in device.get("capabilities", [])
+            }
+        self.dynamic_scenes = json.loads((FIXTURES_DIR / "dynamic_scenes_response.json").read_text())
+        self.diy_scenes = json.loads((FIXTURES_DIR / "diy_scenes_response.json").read_text())
+
+        # fault injection
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.daily_quota = daily_quota
+        self.quota_remaining = daily_quota
+        self._faults: list[tuple[str, int]] = []
+        self._released = asyncio.Event()
+
+        self.requests: Counter[str] = Counter()
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.on_shutdown.append(self._release_hanging)
+        self.app.router.add_get(API_PREFIX + "/user/devices", self._devices)
+        self.app.router.add_post(API_PREFIX + "/device/state", self._state)
+        self.app.router.add_post(API_PREFIX + "/device/control", self._control)
+        self.app.router.add_post(API_PREFIX + "/device/scenes", self._scenes)
+        self.app.router.add_post(API_PREFIX + "/device/diy-scenes", self._diy_scenes)
+
+    def fail_next(self, status: int, count: int = 1) -> None:
+        """Answer the next count requests with an HTTP status - 429 adds a Retry-After header."""
+        self._faults.extend([("status", status)] * count)
+
+    def timeout_next(self, count: int = 1) -> None:
+        """Let the next count requests hang until the client gives up."""
+        self._faults.extend([("timeout", 0)] * count)
+
+    async def _release_hanging(self, app: web.Application) -> None:
+        """Let hanging requests finish so the server can shut down."""
+        self._released.set()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        """Count the request and apply the injected faults."""
+        self.requests[request.path.removeprefix(API_PREFIX + "/")] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self._faults:
+            kind, status = self._faults.pop(0)
+            if kind == "timeout":
+                await self._released.wait()
+            headers = {"Retry-After": "1"} if status == 429 else {}
+            return web.json_response({"code": status, "message": "injected fault"}, status=status, headers=headers)
+        if self.error_rate and random.random() < self.error_rate:
+            return web.json_response({"code": 503, "message": "injected fault"}, status=503)
+        if self.quota_remaining is None:
+            return await handler(request)
+        if self.quota_remaining <= 0:
+            response = web.json_response({"code": 429, "message": "daily quota exhausted"}, status=429)
+        else:
+            self.quota_remaining -= 1
+            response = await handler(request)
+        response.headers["X-RateLimit-Limit"] = str(self.daily_quota)
+        response.headers["X-RateLimit-Remaining"] = str(self.quota_remaining)
+        return response
+
+    async def _device(self, request: web.Request) -> tuple[dict, dict]:
+        """Return the request body and the addressed device."""
+        body = await request.json()
+        device = self.devices.get(body.get("payload", {}).get("device"))
+        if device is None:
+            raise web.HTTPBadRequest(
+                text=json.dumps({"code": 400, "message": "device not found"}), content_type="application/json"
+            )
+        return body, device
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        return web.json_response({"code": 200, "message": "success", "data": list(self.devices.values())})
+
+    async def _state(self, request: web.Request) -> web.Response:
+        body, device = await self._device(request)
+        # like the real API, the online state leads the capabilities - the device fixtures do not list it
+        capabilities = [{"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}}]
+        capabilities.extend(
+            {"type": type_, "instance": instance, "state": {"value": value}}
+            for (type_, instance), value in self.states[device["device"]].items()
+        )
+        payload = {"sku": device["sku"], "device": device["device"], "capabilities": capabilities}
+        return web.json_response(
+            {"requestId": body.get("requestId"), "msg": "success", "code": 200, "payload": payload}
+        )
+
+    async def _control(self, request: web.Request) -> web.Response:
+        body, device = await self._device(request)
+        capability = copy.deepcopy(body["payload"]["capability"])
+        self.states[device["device"]][(capability["type"], capability["instance"])] = capability.get("value")
+        capability["state"] = {"status": "success"}
+        return web.json_response(
+            {"requestId": body.get("requestId"), "msg": "success", "code": 200, "capability": capability}
+        )
+
+    async def _scenes(self, request: web.Request) -> web.Response:
+        return await self._scene_response(
+            request, "devices.capabilities.dynamic_scene", "lightScene", self.dynamic_scenes
+        )
+
+    async def _diy_scenes(self, request: web.Request) -> web.Response:
+        return await self._scene_response(request, "devices.capabilities.dynamic_scene", "diyScene", self.diy_scenes)
+
+    async def _scene_response(self, request: web.Request, type_: str, instance: str, options: list) -> web.Response:
+        body, device = await self._device(request)
+        capability = {"type": type_, "instance": instance, "parameters": {"dataType": "ENUM", "options": options}}
+        payload = {"sku": device["sku"], "device": device["device"], "capabilities": [capability]}
+        return web.json_response(
+            {"requestId": body.get("requestId"), "msg": "success", "code": 200, "payload": payload}
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 503")
+    parser.add_argument("--quota", type=int, default=None, help="requests until every answer is a 429")
+    args = parser.parse_args()
+
+    simulator = GoveeAPISimulator(daily_quota=args.quota)
+    simulator.latency = args.latency
+    simulator.error_rate = args.error_rate
+    print(f"Base URL: http://{args.host}:{args.port}{API_PREFIX}")
+    web.run_app(simulator.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
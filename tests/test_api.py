@@ -0,0 +1,529 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from datetime import timedelta
+from http import HTTPStatus
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.const import CONF_API_KEY, CONF_PARAMS, CONF_SCAN_INTERVAL, CONF_STATE, CONF_TIMEOUT
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_capture_events, async_fire_time_changed
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMockResponse
+
+from custom_components.goveelife import api, utils
+from custom_components.goveelife.api import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    GoveeAPICircuitBreaker,
+    GoveeApiClient,
+    GoveeAPILatencyTracker,
+    GoveeAPIPriorityGate,
+    GoveeAPIRateLimit,
+)
+from custom_components.goveelife.const import (
+    CLOUD_API_URL_OPENAPI,
+    DOMAIN,
+    EVENT_OPTIMISTIC_ROLLBACK,
+    PRIORITY_CONTROL,
+    PRIORITY_STATE,
+)
+from custom_components.goveelife.utils import (
+    GoveeAPI_GetCachedStateValue,
+    GoveeAPI_GetClient,
+    GoveeAPI_GetRequestCount,
+    async_GoveeAPI_ControlDevice,
+    async_GoveeAPI_GetDeviceState,
+    async_GoveeAPI_GETRequest,
+    async_GoveeAPI_POSTRequest,
+)
+
+ENTRY_ID = "test_entry_id"
+CONTROL_URL = CLOUD_API_URL_OPENAPI + "/device/control"
+STATE_URL = CLOUD_API_URL_OPENAPI + "/device/state"
+CONTROL_BODY = {"requestId": "test-request-id", "payload": {"sku": "H6008", "device": "AA:BB"}}
+
+
+def _setup_entry_data(hass, **params):
+    hass.data[DOMAIN] = {
+        ENTRY_ID: {
+            CONF_PARAMS: {CONF_API_KEY: "fake-api-key", CONF_SCAN_INTERVAL: 60, CONF_TIMEOUT: 10, **params},
+        }
+    }
+
+
+def _responses(*responses):
+    """Return a side effect answering consecutive requests with the given (status, headers) pairs."""
+    pending = list(responses)
+
+    async def side_effect(method, url, data):
+        status, headers = pending.pop(0)
+        return AiohttpClientMockResponse(method, url, status=status, json={"code": status}, headers=headers)
+
+    return side_effect
+
+
+@pytest.fixture
+def no_sleep():
+    with patch.object(api.asyncio, "sleep", new=AsyncMock()) as sleep:
+        yield sleep
+
+
+@pytest.mark.asyncio
+async def test_control_is_retried_with_the_same_request_id(hass, aioclient_mock, no_sleep):
+    _setup_entry_data(hass)
+    aioclient_mock.post(CONTROL_URL, side_effect=_responses((503, {}), (502, {}), (200, {})))
+
+    result = await async_GoveeAPI_POSTRequest(hass, ENTRY_ID, "device/control", CONTROL_BODY)
+
+    assert result == {"code": 200}
+    request_ids = {call[2]["requestId"] for call in aioclient_mock.mock_calls}
+    assert len(aioclient_mock.mock_calls) == 3
+    assert len(request_ids) == 1
+    # every retry is charged against the quota
+    assert GoveeAPI_GetRequestCount(hass, ENTRY_ID) == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_is_respected(hass, aioclient_mock, no_sleep):
+    _setup_entry_data(hass, retries=1)
+    aioclient_mock.post(CONTROL_URL, side_effect=_responses((500, {}), (500, {})))
+
+    result = await async_GoveeAPI_POSTRequest(hass, ENTRY_ID, "device/control", CONTROL_BODY, True)
+
+    assert result == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert len(aioclient_mock.mock_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_respected(hass, aioclient_mock, no_sleep):
+    _setup_entry_data(hass)
+    aioclient_mock.post(CONTROL_URL, side_effect=_responses((429, {"Retry-After": "7"}), (200, {})))
+
+    assert await async_GoveeAPI_POSTRequest(hass, ENTRY_ID, "device/control", CONTROL_BODY) == {"code": 200}
+    no_sleep.assert_awaited_once_with(7.0)
+
+
+@pytest.mark.asyncio
+async def test_scene_requests_are_not_retried(hass, aioclient_mock, no_sleep):
+    _setup_entry_data(hass)
+    aioclient_mock.post(CLOUD_API_URL_OPENAPI + "/device/scenes", status=503)
+
+    assert await async_GoveeAPI_POSTRequest(hass, ENTRY_ID, "device/scenes", CONTROL_BODY) is None
+    assert len(aioclient_mock.mock_calls) == 1
+
+
+@pytest.mark.parametrize(
+    ("attempt", "status", "retry_after", "expected"),
+    [
+        (0, 400, None, None),
+        (0, 401, None, None),
+        # daily quota exhausted - nothing to gain from a retry
+        (0, 429, None, None),
+        (0, 503, "3", 3.0),
+        # the server asks for a longer break than any retry budget allows
+        (0, 503, "3600", None),
+    ],
+)
+def test_retry_delay(attempt, status, retry_after, expected):
+    assert GoveeApiClient.retry_delay(attempt, status, retry_after) == expected
+
+
+@pytest.mark.parametrize("attempt", [0, 1, 2, 3, 10])
+def test_retry_backoff_grows_exponentially_with_jitter(attempt):
+    backoff = min(30, 2**attempt)
+
+    assert backoff / 2 <= GoveeApiClient.retry_delay(attempt, 503) <= backoff
+
+
+def test_circuit_opens_after_consecutive_failures_and_probes_once():
+    breaker = GoveeAPICircuitBreaker("test_entry_id", threshold=2, recovery=60)
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow_request()
+    with patch("custom_components.goveelife.api.time.monotonic", return_value=time.monotonic() + 61):
+        assert breaker.allow_request()
+        assert breaker.state == CIRCUIT_HALF_OPEN
+        # only a single probe while half open
+        assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = GoveeAPICircuitBreaker("test_entry_id", threshold=1, recovery=0)
+    breaker.record_failure()
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_OPEN
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_short_circuits_requests(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    aioclient_mock.get(CLOUD_API_URL_OPENAPI + "/user/devices", status=503)
+
+    for _ in range(5):
+        assert await async_GoveeAPI_GETRequest(hass, ENTRY_ID, "user/devices") is None
+
+    assert GoveeAPI_GetClient(hass, ENTRY_ID).circuit_breaker.state == CIRCUIT_OPEN
+    assert await async_GoveeAPI_GETRequest(hass, ENTRY_ID, "user/devices") is None
+    assert len(aioclient_mock.mock_calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_state_requests_share_one_api_call(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    payload = {"sku": "H6008", "device": "AA:BB", "capabilities": []}
+    aioclient_mock.post(CLOUD_API_URL_OPENAPI + "/device/state", json={"code": 200, "payload": payload})
+    device_cfg = {"sku": "H6008", "device": "AA:BB"}
+
+    results = await asyncio.gather(*(async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg) for _ in range(3)))
+
+    assert results == [True, True, True]
+    assert len(aioclient_mock.mock_calls) == 1
+    assert hass.data[DOMAIN][ENTRY_ID][CONF_STATE]["AA:BB"].as_api_json() == payload
+
+    # a later refresh sends a new request
+    assert await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg)
+    assert len(aioclient_mock.mock_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_request_does_not_block_the_startup(hass):
+    _setup_entry_data(hass)
+    client = GoveeAPI_GetClient(hass, ENTRY_ID)
+    blocking = []
+
+    async def request():
+        blocking.append(asyncio.current_task() in hass._tasks)
+
+    await client.single_flight("device/state AA:BB", request)
+
+    assert blocking == [False]
+
+
+@pytest.mark.asyncio
+async def test_control_body_is_sent_as_built(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    capability = {"type": "devices.capabilities.on_off", "instance": "powerSwitch", "value": 1}
+    aioclient_mock.post(CONTROL_URL, json={"code": 200, "capability": capability})
+
+    result = await GoveeAPI_GetClient(hass, ENTRY_ID).async_control("H6008", "AA:BB", capability)
+
+    assert result["capability"] == capability
+    body = aioclient_mock.mock_calls[0][2]
+    assert body["payload"] == {"sku": "H6008", "device": "AA:BB", "capability": capability}
+    assert str(uuid.UUID(body["requestId"])) == body["requestId"]
+
+
+@pytest.mark.asyncio
+async def test_state_poll_in_flight_does_not_overwrite_a_later_command(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    device_cfg = {"sku": "H6008", "device": "AA:BB"}
+    power = {"type": "devices.capabilities.on_off", "instance": "powerSwitch"}
+
+    def state(value):
+        return {"code": 200, "payload": {**device_cfg, "capabilities": [{**power, "state": {"value": value}}]}}
+
+    aioclient_mock.post(STATE_URL, json=state(0))
+    assert await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg)
+
+    released = asyncio.Event()
+
+    async def stale_state(method, url, data):
+        await released.wait()
+        return AiohttpClientMockResponse(method, url, json=state(0))
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.post(STATE_URL, side_effect=stale_state)
+    echo = {**power, "value": 1, "state": {"status": "success"}}
+    aioclient_mock.post(CONTROL_URL, json={"code": 200, "capability": echo})
+    poll = hass.async_create_task(async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg))
+    while not aioclient_mock.mock_calls:
+        await asyncio.sleep(0)
+
+    assert await async_GoveeAPI_ControlDevice(hass, ENTRY_ID, device_cfg, {**power, "value": 1})
+    released.set()
+    assert await poll
+    assert GoveeAPI_GetCachedStateValue(hass, ENTRY_ID, "AA:BB", power["type"], power["instance"]) == 1
+
+
+POWER = {"type": "devices.capabilities.on_off", "instance": "powerSwitch"}
+
+
+async def _cache_power_state(hass, aioclient_mock, value):
+    payload = {"sku": "H6008", "device": "AA:BB", "capabilities": [{**POWER, "state": {"value": value}}]}
+    aioclient_mock.post(STATE_URL, json={"code": 200, "payload": payload})
+    assert await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, {"sku": "H6008", "device": "AA:BB"})
+    aioclient_mock.clear_requests()
+
+
+def _cached_power(hass):
+    return GoveeAPI_GetCachedStateValue(hass, ENTRY_ID, "AA:BB", POWER["type"], POWER["instance"])
+
+
+def test_cached_state_value_of_a_device_without_state_is_none(hass, caplog):
+    _setup_entry_data(hass)
+
+    assert _cached_power(hass) is None
+    assert "GoveeAPI_GetCachedStateValue" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_rejected_command_rolls_the_optimistic_state_back(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    await _cache_power_state(hass, aioclient_mock, 0)
+    events = async_capture_events(hass, EVENT_OPTIMISTIC_ROLLBACK)
+    shown = []
+
+    async def rejected(method, url, data):
+        shown.append(_cached_power(hass))
+        return AiohttpClientMockResponse(method, url, status=400, json={"code": 400})
+
+    aioclient_mock.post(CONTROL_URL, side_effect=rejected)
+
+    device_cfg = {"sku": "H6008", "device": "AA:BB"}
+    assert not await async_GoveeAPI_ControlDevice(hass, ENTRY_ID, device_cfg, {**POWER, "value": 1})
+    await hass.async_block_till_done()
+
+    # the expected state was shown while the command was in flight
+    assert shown == [1]
+    assert _cached_power(hass) == 0
+    assert [event.data["reason"] for event in events] == ["rejected"]
+
+
+@pytest.mark.asyncio
+async def test_unconfirmed_optimistic_state_is_rolled_back_after_the_window(hass, aioclient_mock):
+    _setup_entry_data(hass, optimistic_window=5)
+    await _cache_power_state(hass, aioclient_mock, 0)
+    events = async_capture_events(hass, EVENT_OPTIMISTIC_ROLLBACK)
+    echo = {**POWER, "value": 1, "state": {"status": "failure"}}
+    aioclient_mock.post(CONTROL_URL, json={"code": 200, "capability": echo})
+
+    assert await async_GoveeAPI_ControlDevice(
+        hass, ENTRY_ID, {"sku": "H6008", "device": "AA:BB"}, {**POWER, "value": 1}
+    )
+    assert _cached_power(hass) == 1
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+
+    assert _cached_power(hass) == 0
+    assert [event.data["reason"] for event in events] == ["timeout"]
+
+
+@pytest.mark.asyncio
+async def test_optimistic_state_is_confirmed_by_a_later_poll(hass, aioclient_mock):
+    _setup_entry_data(hass, optimistic_window=5)
+    await _cache_power_state(hass, aioclient_mock, 0)
+    events = async_capture_events(hass, EVENT_OPTIMISTIC_ROLLBACK)
+    echo = {**POWER, "value": 1, "state": {"status": "failure"}}
+    aioclient_mock.post(CONTROL_URL, json={"code": 200, "capability": echo})
+    assert await async_GoveeAPI_ControlDevice(
+        hass, ENTRY_ID, {"sku": "H6008", "device": "AA:BB"}, {**POWER, "value": 1}
+    )
+
+    aioclient_mock.clear_requests()
+    await _cache_power_state(hass, aioclient_mock, 1)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=6))
+    await hass.async_block_till_done()
+
+    assert _cached_power(hass) == 1
+    assert events == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("threshold", "executor_jobs"), [(65536, 0), (10, 1)])
+async def test_large_responses_are_decoded_off_the_event_loop(hass, aioclient_mock, threshold, executor_jobs):
+    _setup_entry_data(hass)
+    devices = [{"sku": "H6008", "device": "AA:BB", "capabilities": []}]
+    aioclient_mock.get(CLOUD_API_URL_OPENAPI + "/user/devices", json={"code": 200, "data": devices})
+
+    with (
+        patch("custom_components.goveelife.api.JSON_EXECUTOR_THRESHOLD", threshold),
+        patch.object(hass, "async_add_executor_job", wraps=hass.async_add_executor_job) as executor,
+    ):
+        assert await GoveeAPI_GetClient(hass, ENTRY_ID).async_get_devices() == devices
+
+    assert executor.call_count == executor_jobs
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_headers_are_the_source_of_truth_for_the_quota(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    reset = int(time.time()) + 3600
+    aioclient_mock.get(
+        CLOUD_API_URL_OPENAPI + "/user/devices",
+        json={"code": 200, "data": []},
+        headers={"X-RateLimit-Limit": "10000", "X-RateLimit-Remaining": "9000", "X-RateLimit-Reset": str(reset)},
+    )
+
+    await async_GoveeAPI_GETRequest(hass, ENTRY_ID, "user/devices")
+
+    rate_limit = GoveeAPI_GetClient(hass, ENTRY_ID).rate_limit
+    assert (rate_limit.limit, rate_limit.remaining, rate_limit.reset.timestamp()) == (10000, 9000, reset)
+    # requests of other tools using the same key are counted
+    assert GoveeAPI_GetRequestCount(hass, ENTRY_ID) == 1000
+
+
+@pytest.mark.asyncio
+async def test_fallback_rate_limit_headers_do_not_raise_the_request_count(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    aioclient_mock.get(
+        CLOUD_API_URL_OPENAPI + "/user/devices",
+        json={"code": 200, "data": []},
+        headers={"API-RateLimit-Limit": "100", "API-RateLimit-Remaining": "95"},
+    )
+
+    await async_GoveeAPI_GETRequest(hass, ENTRY_ID, "user/devices")
+
+    rate_limit = GoveeAPI_GetClient(hass, ENTRY_ID).rate_limit
+    assert (rate_limit.limit, rate_limit.remaining, rate_limit.daily) == (100, 95, False)
+    # only the ledger counts - the fallback family is not the daily quota
+    assert GoveeAPI_GetRequestCount(hass, ENTRY_ID) == 1
+
+
+def test_fallback_rate_limit_headers_keep_the_daily_values():
+    rate_limit = GoveeAPIRateLimit("test_entry_id")
+
+    rate_limit.update({"X-RateLimit-Limit": "10000", "X-RateLimit-Remaining": "9000"})
+    rate_limit.update({"API-RateLimit-Remaining": "95"})
+
+    assert (rate_limit.limit, rate_limit.remaining, rate_limit.daily) == (10000, 9000, True)
+
+
+def test_rate_limit_is_forgotten_after_the_reset():
+    rate_limit = GoveeAPIRateLimit("test_entry_id")
+    listener = MagicMock()
+    rate_limit.async_add_listener(listener)
+
+    rate_limit.update({"API-RateLimit-Remaining": "0", "API-RateLimit-Reset": "-1"})
+
+    listener.assert_called_once()
+    assert rate_limit.remaining is None
+
+
+def test_timeout_follows_the_observed_latency():
+    tracker = GoveeAPILatencyTracker("test_entry_id", factor=3, floor=2)
+    assert tracker.timeout("device/state", 10) == 10
+
+    for _ in range(50):
+        tracker.record("device/state", 0.3)
+    tracker.record("device/state", 1.5)
+    # p99 of 51 samples is 1.5 -> 4.5 seconds
+    assert tracker.timeout("/device/state", 10) == pytest.approx(4.5)
+
+    for _ in range(50):
+        tracker.record("device/state", 0.2)
+    assert tracker.timeout("device/state", 10) == 2
+    # slow but healthy endpoints are capped by the configured timeout
+    for _ in range(100):
+        tracker.record("user/devices", 8)
+    assert tracker.timeout("user/devices", 10) == 10
+
+
+@pytest.mark.asyncio
+async def test_timed_out_requests_widen_the_timeout(hass, aioclient_mock):
+    _setup_entry_data(hass)
+    client = GoveeAPI_GetClient(hass, ENTRY_ID)
+    for _ in range(20):
+        client.latency.record("device/state", 0.1)
+    aioclient_mock.post(CLOUD_API_URL_OPENAPI + "/device/state", exc=TimeoutError)
+
+    with pytest.raises(TimeoutError):
+        async with client.request("POST", "device/state", CONTROL_BODY):
+            pass
+
+    assert client.latency.percentile("device/state", 100) == 2
+
+
+def _state_requests(*delays):
+    """Return a request factory answering consecutive requests after the given delays."""
+    pending = list(delays)
+
+    async def request():
+        delay = pending.pop(0)
+        await asyncio.sleep(delay)
+        return {"code": 200, "payload": {"answered_after": delay}}
+
+    return request
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("allowed", "answered_after"), [(True, 0), (False, 0.2)])
+async def test_slow_state_request_is_hedged_if_budget_allows(hass, allowed, answered_after):
+    _setup_entry_data(hass)
+    client = GoveeAPI_GetClient(hass, ENTRY_ID)
+
+    result = await client._async_hedged(_state_requests(0.2, 0), 0.01, lambda: allowed)
+
+    assert result["payload"]["answered_after"] == answered_after
+
+
+@pytest.mark.asyncio
+async def test_hedged_requests_do_not_block_the_startup(hass):
+    _setup_entry_data(hass)
+    client = GoveeAPI_GetClient(hass, ENTRY_ID)
+    answer = _state_requests(0.2, 0)
+    blocking = []
+
+    async def request():
+        blocking.append(asyncio.current_task() in hass._tasks)
+        return await answer()
+
+    await client._async_hedged(request, 0.01, lambda: True)
+
+    assert blocking == [False, False]
+
+
+@pytest.mark.asyncio
+async def test_priority_gate_lets_control_in_before_queued_polls():
+    gate = GoveeAPIPriorityGate(limit=1)
+    entered = []
+    release = asyncio.Event()
+
+    async def request(name, priority):
+        async with gate.slot(priority):
+            entered.append(name)
+            await release.wait()
+
+    first = asyncio.create_task(request("poll0", PRIORITY_STATE))
+    await asyncio.sleep(0)
+    queued = [asyncio.create_task(request(f"poll{i}", PRIORITY_STATE)) for i in range(1, 4)]
+    queued.append(asyncio.create_task(request("control", PRIORITY_CONTROL)))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, *queued)
+
+    assert entered[:2] == ["poll0", "control"]
+    assert gate.active == 0
+
+
+@pytest.mark.asyncio
+async def test_first_refreshes_run_concurrently_within_the_limit(hass):
+    _setup_entry_data(hass, startup_concurrency=3)
+    running = []
+    peak = refreshed = 0
+
+    async def refresh():
+        nonlocal peak, refreshed
+        refreshed += 1
+        running.append(None)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.pop()
+
+    coordinators = [MagicMock(async_first_refresh=refresh) for _ in range(10)]
+    with patch.object(utils, "STARTUP_REFRESH_STAGGER", 0):
+        await utils.async_GoveeAPI_RefreshCoordinators(hass, ENTRY_ID, coordinators)
+
+    assert (refreshed, peak) == (10, 3)
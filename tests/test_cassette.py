@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.const import CONF_API_KEY
+
+from custom_components.goveelife import cassette as cassette_module
+from custom_components.goveelife.api import GoveeApiClient
+from custom_components.goveelife.cassette import GoveeAPICassette
+from custom_components.goveelife.const import CASSETTE_RECORD, CASSETTE_REPLAY, CLOUD_API_URL_OPENAPI
+
+STATE_REQUEST = {"requestId": "1", "payload": {"sku": "H6008", "device": "AA:BB"}}
+STATE_RESPONSE = {"code": 200, "payload": {"sku": "H6008", "device": "AA:BB", "capabilities": []}}
+
+
+def _client(hass, path, mode, latency_scale=1.0):
+    client = GoveeApiClient(hass, "test_entry_id", {CONF_API_KEY: "fake-api-key"})
+    client.cassette = GoveeAPICassette(hass, "test_entry_id", mode, latency_scale, path=str(path))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_recorded_traffic_is_replayed_without_api_calls(hass, aioclient_mock, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    aioclient_mock.post(
+        CLOUD_API_URL_OPENAPI + "/device/state", json=STATE_RESPONSE, headers={"X-RateLimit-Remaining": "9"}
+    )
+    recorder = _client(hass, path, CASSETTE_RECORD)
+    async with recorder.request("POST", "device/state", STATE_REQUEST) as r:
+        assert await r.json() == STATE_RESPONSE
+    await recorder.async_close()
+    assert len(path.read_text().splitlines()) == 1
+
+    player = _client(hass, path, CASSETTE_REPLAY, latency_scale=0)
+    # the requestId differs on every request and is ignored for matching
+    async with player.request("POST", "/device/state", {**STATE_REQUEST, "requestId": "2"}) as r:
+        assert r.status == 200
+        assert r.headers["x-ratelimit-remaining"] == "9"
+        assert await r.json() == STATE_RESPONSE
+    assert len(aioclient_mock.mock_calls) == 1
+    assert player.rate_limit.remaining is None
+
+
+@pytest.mark.asyncio
+async def test_replayed_requests_spend_no_quota(hass, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    interaction = {
+        "t": 0,
+        "method": "POST",
+        "path": "device/state",
+        "request": STATE_REQUEST,
+        "status": 200,
+        "headers": {"X-RateLimit-Limit": "10000", "X-RateLimit-Remaining": "10"},
+        "body": json.dumps(STATE_RESPONSE),
+        "latency": 0,
+    }
+    path.write_text(json.dumps(interaction) + "\n")
+    player = _client(hass, path, CASSETTE_REPLAY, latency_scale=0)
+    tokens = player.rate_limiter.tokens
+
+    assert await player.async_post("device/state", STATE_REQUEST) == STATE_RESPONSE
+
+    assert player.ledger.count() == 0
+    assert player.rate_limit.remaining is None
+    assert player.request_count() == 0
+    assert player.rate_limiter.tokens == pytest.approx(tokens)
+
+
+@pytest.mark.asyncio
+async def test_replay_scales_the_recorded_latency(hass, tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    interaction = {
+        "t": 0,
+        "method": "GET",
+        "path": "user/devices",
+        "request": None,
+        "status": 200,
+        "headers": {},
+        "body": json.dumps({"code": 200, "data": []}),
+        "latency": 0.8,
+    }
+    path.write_text(json.dumps(interaction) + "\n")
+    player = _client(hass, path, CASSETTE_REPLAY, latency_scale=0.5)
+
+    with patch.object(cassette_module.asyncio, "sleep", new=AsyncMock()) as sleep:
+        async with player.request("GET", "user/devices") as r:
+            assert (await r.json())["data"] == []
+        async with player.request("GET", "user/scenes") as r:
+            assert r.status == 404
+
+    sleep.assert_awaited_once_with(0.4)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.const import CONF_API_KEY, CONF_DEVICES, CONF_PARAMS, CONF_SCAN_INTERVAL, CONF_STATE, CONF_TIMEOUT
+
+from custom_components.goveelife.const import CLOUD_API_URL_OPENAPI, CONF_COORDINATORS, DOMAIN
+from custom_components.goveelife.entities import GoveeAPIUpdateCoordinator
+from custom_components.goveelife.sensor import GoveeLifeSensor
+
+DEVICE_CFG = {"sku": "H7126", "device": "AA:BB", "deviceName": "Purifier"}
+STATE_URL = CLOUD_API_URL_OPENAPI + "/device/state"
+
+
+def _payload(temperature, humidity=40):
+    return {
+        "code": 200,
+        "payload": {
+            "sku": "H7126",
+            "device": "AA:BB",
+            "capabilities": [
+                {"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}},
+                {
+                    "type": "devices.capabilities.property",
+                    "instance": "sensorTemperature",
+                    "state": {"value": temperature},
+                },
+                {"type": "devices.capabilities.property", "instance": "sensorHumidity", "state": {"value": humidity}},
+            ],
+        },
+    }
+
+
+def _sensor(hass, mock_config_entry, coordinator, instance):
+    cap = {"type": "devices.capabilities.property", "instance": instance}
+    return GoveeLifeSensor(hass, mock_config_entry, coordinator, DEVICE_CFG, platform="sensor", cap=cap)
+
+
+@pytest.fixture
+def coordinator(hass, mock_config_entry):
+    hass.data[DOMAIN] = {
+        mock_config_entry.entry_id: {
+            CONF_PARAMS: {CONF_API_KEY: "fake-api-key", CONF_SCAN_INTERVAL: 60, CONF_TIMEOUT: 10},
+            CONF_DEVICES: [DEVICE_CFG],
+        }
+    }
+    coordinator = GoveeAPIUpdateCoordinator(hass, mock_config_entry.entry_id, DEVICE_CFG)
+    hass.data[DOMAIN][mock_config_entry.entry_id][CONF_COORDINATORS] = {DEVICE_CFG["device"]: coordinator}
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_only_entities_with_changed_capabilities_write_state(
+    hass, aioclient_mock, mock_config_entry, coordinator
+):
+    temperature = _sensor(hass, mock_config_entry, coordinator, "sensorTemperature")
+    humidity = _sensor(hass, mock_config_entry, coordinator, "sensorHumidity")
+
+    async def refresh(payload):
+        aioclient_mock.clear_requests()
+        aioclient_mock.post(STATE_URL, json=payload)
+        await coordinator._async_update_data()
+        temperature._handle_coordinator_update()
+        humidity._handle_coordinator_update()
+
+    with (
+        patch.object(temperature, "async_write_ha_state") as temperature_write,
+        patch.object(humidity, "async_write_ha_state") as humidity_write,
+    ):
+        # the first state of the device updates every entity
+        await refresh(_payload(70))
+        assert coordinator.changed is None
+        assert (temperature_write.call_count, humidity_write.call_count) == (1, 1)
+
+        await refresh(_payload(70))
+        assert coordinator.changed == set()
+        assert (temperature_write.call_count, humidity_write.call_count) == (1, 1)
+
+        await refresh(_payload(71))
+        assert coordinator.changed == {("devices.capabilities.property", "sensorTemperature")}
+        assert (temperature_write.call_count, humidity_write.call_count) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_refreshing_a_restored_state_updates_every_entity(hass, aioclient_mock, mock_config_entry, coordinator):
+    sensor = _sensor(hass, mock_config_entry, coordinator, "sensorHumidity")
+    aioclient_mock.post(STATE_URL, json=_payload(70))
+    await coordinator._async_update_data()
+    hass.data[DOMAIN][mock_config_entry.entry_id][CONF_STATE]["AA:BB"].stale = True
+    assert sensor.extra_state_attributes == {"stale": True}
+
+    await coordinator._async_update_data()
+
+    assert coordinator.changed is None
+    assert sensor.extra_state_attributes == {}
+
+
+@pytest.mark.asyncio
+async def test_first_refresh_waits_for_a_request_token(hass, coordinator):
+    with patch("custom_components.goveelife.entities.async_GoveeAPI_GetDeviceState", new=AsyncMock()) as get_state:
+        await coordinator.async_first_refresh()
+        await coordinator.async_refresh()
+
+    # a dropped first poll would leave the entities unavailable for a whole interval
+    assert [call.kwargs["wait"] for call in get_state.await_args_list] == [True, False]
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.goveelife.const import PRIORITY_CONTROL, PRIORITY_STATE
+from custom_components.goveelife.quota import GoveeAPIPollPlanner, GoveeAPIRateLimiter, GoveeAPIRequestLedger
+
+
+def test_burst_is_granted_then_requests_are_dropped():
+    limiter = GoveeAPIRateLimiter("test_entry_id", daily_limit=10000, burst_size=3)
+
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_low_priority_work_is_dropped_without_waiting():
+    limiter = GoveeAPIRateLimiter("test_entry_id", daily_limit=10000, burst_size=1)
+    assert await limiter.async_acquire(wait=False)
+
+    assert not await limiter.async_acquire(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_waiting_caller_gets_the_next_refilled_token():
+    # 86400 requests per day refill one token per second
+    limiter = GoveeAPIRateLimiter("test_entry_id", daily_limit=86400 * 20, burst_size=1)
+    assert limiter.try_acquire()
+
+    assert await limiter.async_acquire(wait=True, max_wait=1)
+
+
+@pytest.mark.asyncio
+async def test_daily_budget_is_never_exceeded():
+    spent = 10000
+    limiter = GoveeAPIRateLimiter("test_entry_id", daily_limit=10000, burst_size=100, spent=lambda: spent)
+
+    assert not limiter.try_acquire()
+    assert not await limiter.async_acquire(wait=True, max_wait=1)
+
+
+def test_poll_interval_stretches_to_fit_the_quota_share():
+    planner = GoveeAPIPollPlanner("test_entry_id", daily_limit=10000, quota_share=80)
+
+    # 60 devices with 8000 requests left for a full day: one poll per device every 648 seconds
+    assert planner.plan(60, 0, 86400, min_interval=60) == pytest.approx(648)
+    # few devices keep the configured minimum interval
+    assert planner.plan(2, 0, 86400, min_interval=60) == 60
+    # a spent budget is sustained, not used up - requests age out of the window as fast as they come in
+    assert planner.plan(60, 8000, 86400, min_interval=60) == pytest.approx(648)
+    # spend beyond the budget is paid back within the next window
+    assert planner.plan(60, 12000, 86400, min_interval=60) == pytest.approx(1296)
+    assert planner.plan(60, 16000, 86400, min_interval=60) == 86400
+
+
+def test_poll_plan_spends_the_budget_over_several_windows():
+    planner = GoveeAPIPollPlanner("test_entry_id", daily_limit=10000, quota_share=80)
+    window, step, devices = 86400, 60, 20
+    buckets = deque([0.0] * (window // step))
+    owed = 0.0
+
+    # five days of polling, re-planned every minute from the rolling window spend
+    for _ in range(5 * window // step):
+        interval = planner.plan(devices, int(sum(buckets)), window, min_interval=60)
+        owed += devices * step / interval
+        buckets.popleft()
+        buckets.append(int(owed))
+        owed -= int(owed)
+
+    assert 0.95 * planner.budget <= sum(buckets) <= planner.budget
+    assert planner.interval == pytest.approx(devices * window / planner.budget, rel=0.05)
+
+
+def test_poll_plan_drift_is_detected():
+    planner = GoveeAPIPollPlanner("test_entry_id", daily_limit=10000, quota_share=80)
+    assert planner.drifted(0)
+
+    planner.plan(10, 100, 86400, min_interval=60)
+
+    assert not planner.drifted(100)
+    assert planner.drifted(500)
+
+
+@pytest.mark.asyncio
+async def test_ledger_counts_requests_per_endpoint_within_the_window(hass):
+    ledger = GoveeAPIRequestLedger(hass, "test_entry_id", window=60)
+
+    ledger.record("device/state")
+    ledger.record("/device/control/")
+    ledger.record("device/state")
+
+    assert ledger.counts() == {"device/state": 2, "device/control": 1}
+    with patch("custom_components.goveelife.quota.time.time", return_value=time.time() + 61):
+        assert ledger.count() == 0
+
+
+@pytest.mark.asyncio
+async def test_ledger_survives_a_restart(hass, hass_storage):
+    ledger = GoveeAPIRequestLedger(hass, "test_entry_id")
+    ledger.record("user/devices")
+    await ledger.async_flush()
+
+    restored = GoveeAPIRequestLedger(hass, "test_entry_id")
+    await restored.async_load()
+
+    assert restored.count("user/devices") == 1
+
+
+@pytest.mark.asyncio
+async def test_ledger_is_written_while_requests_keep_coming_in(hass, hass_storage):
+    ledger = GoveeAPIRequestLedger(hass, "test_entry_id")
+    now = dt_util.utcnow()
+
+    # a request every 30 seconds never leaves the 60 seconds save delay idle
+    for seconds in (0, 30, 61):
+        if seconds:
+            async_fire_time_changed(hass, now + timedelta(seconds=seconds))
+            await hass.async_block_till_done()
+        ledger.record("device/state")
+
+    assert (
+        len(hass_storage[GoveeAPIRequestLedger.storage_key("test_entry_id")]["data"]["requests"]["device/state"]) == 2
+    )
+
+
+def test_spare_budget_is_only_reported_beyond_the_plan():
+    planner = GoveeAPIPollPlanner("test_entry_id", daily_limit=10000, quota_share=80)
+    assert not planner.has_spare(0, 86400)
+
+    # 2 devices at the 60 second minimum need 2880 of 8000 requests
+    planner.plan(2, 0, 86400, min_interval=60)
+    assert planner.has_spare(0, 86400)
+    # 60 devices stretch the interval until the budget is used up
+    planner.plan(60, 0, 86400, min_interval=60)
+    assert not planner.has_spare(0, 86400)
+
+
+@pytest.mark.asyncio
+async def test_waiting_control_request_gets_the_next_token_first():
+    # 86400 * 20 requests per day refill 20 tokens per second
+    limiter = GoveeAPIRateLimiter("test_entry_id", daily_limit=86400 * 20, burst_size=1)
+    assert limiter.try_acquire()
+    served = []
+
+    async def acquire(name, priority):
+        assert await limiter.async_acquire(wait=True, max_wait=5, priority=priority)
+        served.append(name)
+
+    polls = [asyncio.create_task(acquire(f"poll{i}", PRIORITY_STATE)) for i in range(3)]
+    await asyncio.sleep(0)
+    await asyncio.gather(acquire("control", PRIORITY_CONTROL), *polls)
+
+    assert served[0] == "control"
+
+
+def test_control_reserve_is_only_spent_by_control():
+    spent = 8600
+    limiter = GoveeAPIRateLimiter("test_entry_id", daily_limit=10000, spent=lambda: spent, control_reserve=15)
+
+    assert not limiter.try_acquire(PRIORITY_STATE)
+    assert limiter.try_acquire(PRIORITY_CONTROL)
+
+
+def test_polling_stretches_to_protect_the_control_reserve():
+    planner = GoveeAPIPollPlanner("test_entry_id", daily_limit=10000, quota_share=100, control_reserve=15)
+
+    assert planner.budget == 8500
+    # 60 devices share 8500 requests per day
+    assert planner.plan(60, 0, 86400, min_interval=60) == pytest.approx(86400 * 60 / 8500)
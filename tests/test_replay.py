@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.goveelife import replay as replay_module
+from custom_components.goveelife.replay import GoveeAPIReplayBackend
+
+DUMP = {
+    "data": {
+        "cloud_devices": [{"sku": "H6008", "device": "AA:BB"}],
+        "cloud_states": {"AA:BB": {"sku": "H6008", "device": "AA:BB", "capabilities": []}},
+    }
+}
+
+
+@pytest.fixture
+def dump_file(tmp_path):
+    path = tmp_path / "_diagnostics.json"
+    path.write_text(json.dumps(DUMP))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_replay_is_disabled_without_a_file(hass, tmp_path):
+    replay = GoveeAPIReplayBackend(hass, "test_entry_id", str(tmp_path / "missing.json"))
+
+    assert not await replay.async_setup()
+
+
+@pytest.mark.asyncio
+async def test_replay_file_is_parsed_once_for_all_devices(hass, dump_file):
+    replay = GoveeAPIReplayBackend(hass, "test_entry_id", str(dump_file))
+    assert await replay.async_setup()
+
+    with patch.object(replay_module.json, "load", wraps=json.load) as load:
+        assert await replay.async_devices() == DUMP["data"]["cloud_devices"]
+        for _ in range(60):
+            assert (await replay.async_state("AA:BB"))["device"] == "AA:BB"
+
+    assert load.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_replay_file_is_reloaded(hass, dump_file):
+    replay = GoveeAPIReplayBackend(hass, "test_entry_id", str(dump_file))
+    await replay.async_setup()
+    await replay.async_devices()
+
+    dump_file.write_text(json.dumps({"data": {"cloud_devices": [], "cloud_states": {}}}))
+    mtime = os.path.getmtime(dump_file) + 1
+    os.utime(dump_file, (mtime, mtime))
+    with patch.object(replay_module, "REPLAY_RECHECK_INTERVAL", 0):
+        assert await replay.async_devices() == []
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pytest
+from aiohttp.test_utils import TestServer
+from homeassistant.const import CONF_API_KEY, CONF_PARAMS, CONF_SCAN_INTERVAL, CONF_STATE, CONF_TIMEOUT, CONF_URL
+
+from custom_components.goveelife.api import GoveeApiClient
+from custom_components.goveelife.const import DOMAIN
+from custom_components.goveelife.utils import (
+    GoveeAPI_GetClient,
+    GoveeAPI_GetRequestCount,
+    async_GoveeAPI_ControlDevice,
+    async_GoveeAPI_GetDeviceState,
+    async_GoveeAPI_GetDynamicScenes,
+    async_GoveeAPI_GETRequest,
+)
+
+from .simulator import API_PREFIX, GoveeAPISimulator
+
+ENTRY_ID = "test_entry_id"
+
+
+@pytest.fixture
+async def simulator(hass, socket_enabled):
+    simulator = GoveeAPISimulator()
+    server = TestServer(simulator.app)
+    await server.start_server()
+    hass.data[DOMAIN] = {
+        ENTRY_ID: {
+            CONF_PARAMS: {
+                CONF_API_KEY: "fake-api-key",
+                CONF_SCAN_INTERVAL: 60,
+                CONF_TIMEOUT: 1,
+                CONF_URL: str(server.make_url(API_PREFIX)),
+            },
+        }
+    }
+    yield simulator
+    await GoveeAPI_GetClient(hass, ENTRY_ID).async_close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_devices_state_and_control_against_the_simulator(hass, simulator):
+    devices = await async_GoveeAPI_GETRequest(hass, ENTRY_ID, "user/devices")
+    assert len(devices) == len(simulator.devices)
+    device_cfg = next(d for d in devices if d["sku"] == "H6008")
+
+    assert await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg)
+    capability = {"type": "devices.capabilities.range", "instance": "brightness", "value": 42}
+    assert await async_GoveeAPI_ControlDevice(hass, ENTRY_ID, device_cfg, capability)
+    assert await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg)
+
+    state = hass.data[DOMAIN][ENTRY_ID][CONF_STATE][device_cfg["device"]]
+    assert state.value("devices.capabilities.range", "brightness") == 42
+    assert state.online
+    assert len(await async_GoveeAPI_GetDynamicScenes(hass, ENTRY_ID, device_cfg)) == len(simulator.dynamic_scenes)
+
+
+@pytest.mark.asyncio
+async def test_every_simulated_device_reports_online(hass, simulator):
+    for device_cfg in simulator.devices.values():
+        assert await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg)
+
+        state = hass.data[DOMAIN][ENTRY_ID][CONF_STATE][device_cfg["device"]]
+        assert state.value("devices.capabilities.online", "online") is True
+
+
+@pytest.mark.asyncio
+async def test_injected_faults_are_retried(hass, simulator, monkeypatch):
+    monkeypatch.setattr(GoveeApiClient, "retry_delay", staticmethod(lambda *args: 0))
+    device_cfg = next(iter(simulator.devices.values()))
+    simulator.fail_next(503)
+    simulator.timeout_next()
+
+    assert await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg)
+    assert simulator.requests["device/state"] == 3
+
+
+@pytest.mark.asyncio
+async def test_quota_exhaustion(hass, simulator):
+    simulator.daily_quota = simulator.quota_remaining = 0
+    device_cfg = next(iter(simulator.devices.values()))
+
+    assert not await async_GoveeAPI_GetDeviceState(hass, ENTRY_ID, device_cfg)
+    assert device_cfg["device"] not in hass.data[DOMAIN][ENTRY_ID].get(CONF_STATE, {})
+    # quota errors are not retried
+    assert simulator.requests["device/state"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_quota_headers_are_tracked(hass, simulator):
+    simulator.daily_quota = simulator.quota_remaining = 10000
+    simulator.quota_remaining -= 500  # spent by another tool using the same key
+
+    await async_GoveeAPI_GETRequest(hass, ENTRY_ID, "user/devices")
+
+    assert GoveeAPI_GetClient(hass, ENTRY_ID).rate_limit.remaining == 9499
+    assert GoveeAPI_GetRequestCount(hass, ENTRY_ID) == 501
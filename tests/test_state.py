@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+import pytest
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.goveelife.state import DeviceState, GoveeAPIStateSnapshot, next_revision
+
+PAYLOAD = {
+    "sku": "H6008",
+    "device": "AA:BB",
+    "capabilities": [
+        {"type": "devices.capabilities.online", "instance": "online", "state": {"value": True}},
+        {"type": "devices.capabilities.on_off", "instance": "powerSwitch", "state": {"value": 1}},
+        {"type": "devices.capabilities.range", "instance": "brightness", "state": {"value": 42}},
+        {"type": "devices.capabilities.property", "instance": "sensorTemperature", "state": {"sensorTemperature": 21}},
+    ],
+}
+
+
+def test_values_are_looked_up_by_type_and_instance():
+    state = DeviceState.from_api(PAYLOAD)
+
+    assert state.online
+    assert state.value("devices.capabilities.range", "brightness") == 42
+    assert state.value("devices.capabilities.property", "sensorTemperature") == 21
+    assert state.value("devices.capabilities.range", "humidity") is None
+
+
+def test_update_replaces_known_capabilities_only():
+    state = DeviceState.from_api(PAYLOAD)
+
+    assert state.update("devices.capabilities.on_off", "powerSwitch", {"value": 0})
+    assert not state.update("devices.capabilities.toggle", "oscillationToggle", {"value": 1})
+    assert state.value("devices.capabilities.on_off", "powerSwitch") == 0
+    assert len(state.as_api_json()["capabilities"]) == len(PAYLOAD["capabilities"])
+
+
+def test_as_api_json_round_trips():
+    assert DeviceState.from_api(PAYLOAD).as_api_json() == PAYLOAD
+    assert not DeviceState.from_api({"sku": "H6008", "device": "AA:BB", "capabilities": []}).online
+
+
+def test_capability_keys_are_shared_between_devices():
+    first = DeviceState.from_api(PAYLOAD)
+    second = DeviceState.from_api(json.loads(json.dumps(PAYLOAD)))
+
+    for a, b in zip(first.states, second.states, strict=True):
+        assert a is b
+    assert not hasattr(first, "__dict__")
+
+
+def test_changed_capabilities_are_detected():
+    previous = DeviceState.from_api(PAYLOAD)
+    current = DeviceState.from_api(json.loads(json.dumps(PAYLOAD)))
+
+    assert current.changed(previous) == set()
+    current.update("devices.capabilities.range", "brightness", {"value": 43})
+    del current.states[("devices.capabilities.on_off", "powerSwitch")]
+    assert current.changed(previous) == {
+        ("devices.capabilities.range", "brightness"),
+        ("devices.capabilities.on_off", "powerSwitch"),
+    }
+
+
+def test_states_written_after_a_request_are_kept():
+    issued = next_revision()
+    cached = DeviceState.from_api(PAYLOAD, next_revision())
+    cached.update("devices.capabilities.on_off", "powerSwitch", {"value": 0})
+
+    response = DeviceState.from_api(PAYLOAD, issued)
+
+    assert response.keep_newer(cached) == set(cached.states)
+    assert response.value("devices.capabilities.on_off", "powerSwitch") == 0
+    assert DeviceState.from_api(PAYLOAD, next_revision()).keep_newer(cached) == set()
+
+
+def test_rollback_restores_the_state_before_the_first_unconfirmed_write():
+    state = DeviceState.from_api(PAYLOAD)
+
+    state.apply("devices.capabilities.range", "brightness", {"value": 50})
+    state.apply("devices.capabilities.range", "brightness", {"value": 60})
+    assert state.value("devices.capabilities.range", "brightness") == 60
+
+    assert state.rollback("devices.capabilities.range", "brightness").expected == {"value": 60}
+    assert state.value("devices.capabilities.range", "brightness") == 42
+    assert state.rollback("devices.capabilities.range", "brightness") is None
+
+
+@pytest.mark.asyncio
+async def test_snapshot_restores_confirmed_states_as_stale(hass, hass_storage):
+    state = DeviceState.from_api(PAYLOAD)
+    state.apply("devices.capabilities.range", "brightness", {"value": 50})
+    await GoveeAPIStateSnapshot(hass, "test_entry_id", {"AA:BB": state}).async_flush()
+
+    states = {}
+    await GoveeAPIStateSnapshot(hass, "test_entry_id", states).async_load()
+
+    assert states["AA:BB"].stale
+    assert states["AA:BB"].as_api_json() == PAYLOAD
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_written_while_states_keep_changing(hass, hass_storage):
+    states = {}
+    snapshot = GoveeAPIStateSnapshot(hass, "test_entry_id", states)
+    now = dt_util.utcnow()
+
+    # a poll every 20 seconds never leaves the 30 seconds save delay idle
+    for seconds in (0, 20, 31):
+        if seconds:
+            async_fire_time_changed(hass, now + timedelta(seconds=seconds))
+            await hass.async_block_till_done()
+        states[f"AA:{seconds:02}"] = DeviceState.from_api(PAYLOAD)
+        snapshot.schedule()
+
+    assert set(hass_storage[GoveeAPIStateSnapshot.storage_key("test_entry_id")]["data"]["states"]) == {"AA:00", "AA:20"}